@@ -0,0 +1,51 @@
+"""
+Benchmarks for the user service
+Run a benchmark from the directory where manage.py is, e.g. `python -m benchmarks.throttling`.
+Benchmarks that need tables run against a throwaway test database of the configured database server.
+"""
+import contextlib
+import os
+import time
+
+import django
+
+
+def setup():
+    """
+    Configure Django for a standalone benchmark script
+    :return:
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """
+    Create the test database for the duration of the benchmark and destroy it afterwards
+    :return:
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timeit(func, number):
+    """
+    Call the function number times
+    :param func:
+    :param number:
+    :return: Seconds per call
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
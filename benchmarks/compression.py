@@ -0,0 +1,55 @@
+"""
+Response compression cost and gain
+python -m benchmarks.compression [--repeat 50]
+Renders list pages of 10, 100 and 1000 users and compares the time to compress them against the bytes saved with gzip
+levels and brotli qualities.
+"""
+import argparse
+
+from benchmarks import setup, test_database, timeit
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from service.middleware import brotli, compress
+    from users.models import User
+    from users.views import UserViewSet
+
+    with test_database():
+        UserViewSet.throttle_classes = []
+        User.objects.bulk_create([User(username='user%d' % index, email='user%d@mail.com' % index,
+                                       first_name='First%d' % index, last_name='Last%d' % index, password='benchmark')
+                                  for index in range(1000)])
+        client = APIClient()
+        url = reverse('users:user-list')
+
+        encodings = [('gzip', 'COMPRESSION_GZIP_LEVEL', level) for level in GZIP_LEVELS]
+        if brotli:
+            encodings += [('br', 'COMPRESSION_BROTLI_QUALITY', quality) for quality in BROTLI_QUALITIES]
+
+        print('%-8s %-10s %10s %10s %8s %12s' % ('limit', 'encoding', 'bytes', 'saved', 'ratio', 'us/op'))
+        for limit in (10, 100, 1000):
+            content = client.get(url, {'limit': limit}, format='json').content
+            print('%-8d %-10s %10d %10s %8s %12s' % (limit, 'identity', len(content), '-', '-', '-'))
+            for encoding, setting, level in encodings:
+                with override_settings(**{setting: level}):
+                    size = len(compress(encoding, content))
+                    seconds = timeit(lambda: compress(encoding, content), args.repeat)
+                print('%-8d %-10s %10d %10d %8.2f %12.1f' % (limit, '%s-%d' % (encoding, level), size,
+                                                              len(content) - size, len(content) / size, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
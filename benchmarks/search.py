@@ -0,0 +1,96 @@
+"""
+Partial name search with the trigram index against the naive icontains query
+python -m benchmarks.search [--rows 1000000] [--queries 20]
+"""
+import argparse
+import random
+import string
+import time
+
+from benchmarks import setup, test_database
+
+FIRST_NAMES = ['james', 'mary', 'robert', 'patricia', 'john', 'jennifer', 'michael', 'linda', 'priya', 'arjun',
+               'wei', 'fatima', 'olga', 'kenji', 'amara', 'lucas', 'sofia', 'mateo', 'chloe', 'noah']
+LAST_NAMES = ['smith', 'johnson', 'williams', 'brown', 'jones', 'garcia', 'miller', 'davis', 'kumar', 'singh',
+              'wang', 'khan', 'ivanova', 'tanaka', 'okafor', 'silva', 'rossi', 'lopez', 'martin', 'nguyen']
+
+
+def fake_user(index):
+    """
+    Random searchable values of a seeded user
+    :param index:
+    :return:
+    """
+    suffix = ''.join(random.choices(string.ascii_lowercase, k=4))
+    first_name = random.choice(FIRST_NAMES) + suffix[:2]
+    last_name = random.choice(LAST_NAMES) + suffix[2:]
+    return {
+        'username': 'user%d' % index,
+        'first_name': first_name.title(),
+        'last_name': last_name.title(),
+        'email': '%s.%s%d@example.com' % (first_name, last_name, index),
+        'mobile_number': ''.join(random.choices(string.digits, k=10)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.contrib.auth.hashers import make_password
+    from django.db.models import Q
+    from django.db.models.signals import post_save
+
+    from users.models import User
+    from users.search import index_users, normalize, search
+    from users.signals import update_search_tokens
+
+    random.seed(0)
+    password = make_password('benchmark')
+    post_save.disconnect(update_search_tokens, sender=User)
+
+    with test_database():
+        start = time.perf_counter()
+        seeded = []
+        for offset in range(0, args.rows, args.batch_size):
+            users = [User(password=password, **fake_user(offset + index))
+                     for index in range(min(args.batch_size, args.rows - offset))]
+            User.objects.bulk_create(users)
+            index_users(users)
+            seeded.extend(random.sample(users, min(len(users), 2)))
+        print('seeded and indexed %d users in %.1f s' % (args.rows, time.perf_counter() - start))
+
+        queries = []
+        for user in random.sample(seeded, min(args.queries, len(seeded))):
+            name = random.choice(['first_name', 'last_name', 'email', 'mobile_number'])
+            value = normalize(getattr(user, name))
+            start = random.randrange(max(len(value) - 5, 1))
+            queries.append(value[start:start + 5])
+
+        def naive(query):
+            return list(User.objects.filter(
+                Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(email__icontains=query) |
+                Q(mobile_number__icontains=query)
+            )[:args.limit])
+
+        print('%-10s %14s %14s' % ('query', 'icontains ms', 'trigram ms'))
+        totals = [0, 0]
+        for query in queries:
+            timings = []
+            for func in (naive, lambda value: search(value, args.limit)):
+                start = time.perf_counter()
+                func(query)
+                timings.append(time.perf_counter() - start)
+            totals = [total + timing for total, timing in zip(totals, timings)]
+            print('%-10s %14.2f %14.2f' % (query, timings[0] * 1e3, timings[1] * 1e3))
+        print('%-10s %14.2f %14.2f' % ('mean', totals[0] / len(queries) * 1e3, totals[1] / len(queries) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
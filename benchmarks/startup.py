@@ -0,0 +1,67 @@
+"""
+Worker start up cost per settings profile
+python -m benchmarks.startup [--profiles service.settings service.settings_api] [--runs 5]
+Each run is a fresh interpreter that sets up Django, loads the URLs and the WSGI handler and serves one request
+which does not need the database. It reports the wall time, the summed `-X importtime` self times, the number of
+imported modules and the max RSS.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WORKER = '''
+import io, resource
+from service.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+body = b'{"token": "invalid"}'
+environ = {
+    'REQUEST_METHOD': 'POST', 'PATH_INFO': '/users/verify', 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+    'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body),
+    'wsgi.url_scheme': 'http', 'REMOTE_ADDR': '127.0.0.1',
+}
+b''.join(application(environ, lambda status, headers: None))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+def run(profile):
+    """
+    Start a worker with the settings profile
+    :param profile:
+    :return: Wall seconds, import self microseconds, module count, max RSS in KiB
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', WORKER], env=env, capture_output=True,
+                            text=True, check=True)
+    wall = time.perf_counter() - start
+
+    self_times = [int(line.split('|')[0].split(':')[1]) for line in result.stderr.splitlines()
+                  if line.startswith('import time:') and line.split('|')[0].split(':')[1].strip().isdigit()]
+    return wall, sum(self_times), len(self_times), int(result.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profiles', nargs='+', default=['service.settings', 'service.settings_api'])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print('%-28s %10s %12s %9s %10s' % ('profile', 'wall ms', 'imports ms', 'modules', 'RSS MiB'))
+    for profile in args.profiles:
+        runs = [run(profile) for _ in range(args.runs)]
+        print('%-28s %10.0f %12.0f %9d %10.1f' % (
+            profile,
+            statistics.median(wall for wall, _, _, _ in runs) * 1e3,
+            statistics.median(imports for _, imports, _, _ in runs) / 1e3,
+            runs[0][2],
+            statistics.median(rss for _, _, _, rss in runs) / 1024,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Per request overhead of the sliding window throttles
+python -m benchmarks.throttling [--requests 5000]
+"""
+import argparse
+
+from benchmarks import setup, test_database, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIClient, APIRequestFactory
+    from rest_framework.throttling import ScopedRateThrottle
+
+    from service.throttling import ActionRateThrottle, ClientRateThrottle
+    from users.views import UserViewSet
+
+    rates = dict(api_settings.DEFAULT_THROTTLE_RATES, client='1000000/min')
+    rates['user.list'] = rates['user.retrieve'] = '1000000/min'
+    view = UserViewSet(basename='user', action='list')
+    request = APIRequestFactory().get('/users')
+    request.user = AnonymousUser()
+
+    with override_settings(REST_FRAMEWORK=dict(api_settings.user_settings, DEFAULT_THROTTLE_RATES=rates)):
+        print('%-40s %10s' % ('throttle check', 'us/request'))
+        for throttle_class in (ClientRateThrottle, ActionRateThrottle):
+            cache.clear()
+            seconds = timeit(lambda: throttle_class().allow_request(request, view), args.requests)
+            print('%-40s %10.1f' % (throttle_class.__name__, seconds * 1e6))
+
+        # DRF's history based throttle for comparison, its cost grows with the number of requests in the window
+        ScopedRateThrottle.THROTTLE_RATES = rates
+        view.throttle_scope = 'user.list'
+        cache.clear()
+        seconds = timeit(lambda: ScopedRateThrottle().allow_request(request, view), args.requests)
+        print('%-40s %10.1f' % ('ScopedRateThrottle (DRF history)', seconds * 1e6))
+
+        with test_database():
+            client = APIClient()
+            url = reverse('users:user-list')
+            print('\n%-40s %10s' % ('GET /users (empty table)', 'us/request'))
+            for name, throttle_classes in (('without throttles', []),
+                                           ('with throttles', UserViewSet.throttle_classes)):
+                cache.clear()
+                UserViewSet.throttle_classes, original = throttle_classes, UserViewSet.throttle_classes
+                try:
+                    seconds = timeit(lambda: client.get(url), args.requests // 10)
+                finally:
+                    UserViewSet.throttle_classes = original
+                print('%-40s %10.1f' % (name, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Token verification throughput
+python -m benchmarks.token_verification [--requests 2000]
+Compares the stateless signature check, the verify endpoint with a warm and a cold user cache and a password check
+with the configured hasher iterations.
+"""
+import argparse
+
+from benchmarks import setup, test_database, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import check_password, make_password
+    from django.core.cache import cache
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from users.models import User
+    from users.tokens import issue_token, verify_token
+    from users.views import UserViewSet
+
+    with test_database():
+        UserViewSet.throttle_classes = []
+        user = User.objects.create(username='benchmark', password='benchmark')
+        token = issue_token(user)
+        client = APIClient()
+        url = reverse('users:user-verify')
+
+        def verify_cold():
+            cache.clear()
+            client.post(url, {'token': token}, format='json')
+
+        results = (
+            ('verify_token (signature only)', timeit(lambda: verify_token(token), args.requests)),
+            ('POST /users/verify warm cache', timeit(lambda: client.post(url, {'token': token}, format='json'),
+                                                      args.requests)),
+            ('POST /users/verify cold cache', timeit(verify_cold, args.requests)),
+        )
+
+        password = make_password('benchmark')
+        results += (('check_password %d iterations' % settings.PASSWORD_HASHER_ITERATIONS,
+                     timeit(lambda: check_password('benchmark', password), max(args.requests // 100, 5))),)
+
+        print('%-40s %12s %12s' % ('operation', 'us/op', 'ops/s'))
+        for name, seconds in results:
+            print('%-40s %12.1f %12.0f' % (name, seconds * 1e6, 1 / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Insert throughput of random (version 4) and time ordered (version 7) user ids
+python -m benchmarks.uuid_inserts [--rows 1000000] [--batch-size 100]
+The throughput is reported per tenth of the table, so a slow down while the table grows is visible.
+On MySQL the table and index sizes are reported too.
+"""
+import argparse
+import time
+
+from benchmarks import setup, test_database
+
+
+def table_size(connection, table):
+    """
+    Data and index size in bytes of a MySQL table
+    :param connection:
+    :param table:
+    :return:
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE TABLE %s' % table)
+        cursor.execute('SELECT data_length, index_length FROM information_schema.tables '
+                       'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        return cursor.fetchone()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+
+    import uuid
+
+    from django.contrib.auth.hashers import make_password
+
+    from service.utils import uuid7
+    from users.models import User
+
+    password = make_password('benchmark')
+    table = User._meta.db_table
+    deciles = 10
+    per_decile = args.rows // deciles
+
+    with test_database() as connection:
+        for version, generate in ((4, uuid.uuid4), (7, uuid7)):
+            with connection.cursor() as cursor:
+                cursor.execute(('TRUNCATE TABLE %s' if connection.vendor == 'mysql' else 'DELETE FROM %s') % table)
+
+            rates = []
+            inserted = 0
+            for _ in range(deciles):
+                start = time.perf_counter()
+                for offset in range(0, per_decile, args.batch_size):
+                    count = min(args.batch_size, per_decile - offset)
+                    User.all_objects.bulk_create([
+                        User(id=generate(), username='user%d' % (inserted + index), password=password)
+                        for index in range(count)
+                    ])
+                    inserted += count
+                rates.append(per_decile / (time.perf_counter() - start))
+
+            print('uuid%d rows/s per tenth: %s' % (version, ' '.join('%.0f' % rate for rate in rates)))
+            print('uuid%d mean rows/s: %.0f' % (version, sum(rates) / len(rates)))
+            if connection.vendor == 'mysql':
+                data_length, index_length = table_size(connection, table)
+                print('uuid%d data bytes: %d index bytes: %d' % (version, data_length, index_length))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Index size and primary key lookup latency of char(32) and binary(16) user ids on MySQL
+python -m benchmarks.uuid_storage [--rows 1000000] [--lookups 10000]
+Both layouts get the same seeded rows with a unique username and an index on created, like the users table.
+"""
+import argparse
+import random
+import time
+import uuid
+
+from benchmarks import setup, test_database
+
+TABLES = (
+    ('char(32)', 'bench_user_char', lambda value: value.hex),
+    ('binary(16)', 'bench_user_binary', lambda value: value.bytes),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.utils import timezone
+
+    ids = [uuid.uuid4() for _ in range(args.rows)]
+    sample = random.sample(ids, min(args.lookups, len(ids)))
+    now = timezone.now().replace(tzinfo=None)
+
+    with test_database() as connection:
+        if connection.vendor != 'mysql':
+            raise SystemExit('The id storage benchmark needs MySQL, the database is %s' % connection.vendor)
+
+        with connection.cursor() as cursor:
+            print('%-12s %14s %14s %14s' % ('id type', 'data bytes', 'index bytes', 'lookup us'))
+            for column_type, table, convert in TABLES:
+                cursor.execute('CREATE TABLE %s (id %s NOT NULL PRIMARY KEY, username varchar(150) NOT NULL UNIQUE, '
+                               'created datetime(6) NOT NULL, INDEX (created))' % (table, column_type))
+                for offset in range(0, args.rows, args.batch_size):
+                    cursor.executemany('INSERT INTO %s (id, username, created) VALUES (%%s, %%s, %%s)' % table, [
+                        (convert(value), 'user%d' % (offset + index), now)
+                        for index, value in enumerate(ids[offset:offset + args.batch_size])
+                    ])
+
+                cursor.execute('ANALYZE TABLE %s' % table)
+                cursor.fetchall()
+                cursor.execute('SELECT data_length, index_length FROM information_schema.tables '
+                               'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+                data_length, index_length = cursor.fetchone()
+
+                start = time.perf_counter()
+                for value in sample:
+                    cursor.execute('SELECT id, username FROM %s WHERE id = %%s' % table, [convert(value)])
+                    cursor.fetchone()
+                latency = (time.perf_counter() - start) / len(sample)
+
+                print('%-12s %14d %14d %14.1f' % (column_type, data_length, index_length, latency * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,9 @@ import sys
 
 
 def main():
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings')
+    # The tests run with the in-memory SQLite profile unless another settings module is selected
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'service.settings_test' if sys.argv[1:2] == ['test'] else
+                          'service.settings')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -34,3 +34,58 @@ USER_PARTIAL_UPDATE_API_INIT = 'USER_PARTIAL_UPDATE_API_INIT'
 # User Destroy API
 USER_DESTROY_API_INIT = 'USER_DESTROY_API_INIT'
 USER_DESTROY_API_SUCCESS = 'USER_DESTROY_API_SUCCESS'
+
+# User Login API
+USER_LOGIN_API_INIT = 'USER_LOGIN_API_INIT'
+USER_LOGIN_API_SUCCESS = 'USER_LOGIN_API_SUCCESS'
+USER_LOGIN_API_ERROR = 'USER_LOGIN_API_ERROR'
+USER_LOGIN_API_REHASH = 'USER_LOGIN_API_REHASH'
+
+# User Token Verify API
+USER_VERIFY_API_INIT = 'USER_VERIFY_API_INIT'
+USER_VERIFY_API_SUCCESS = 'USER_VERIFY_API_SUCCESS'
+USER_VERIFY_API_ERROR = 'USER_VERIFY_API_ERROR'
+
+# User Search API
+USER_SEARCH_API_INIT = 'USER_SEARCH_API_INIT'
+USER_SEARCH_API_SUCCESS = 'USER_SEARCH_API_SUCCESS'
+USER_SEARCH_API_ERROR = 'USER_SEARCH_API_ERROR'
+
+# User Batch Retrieve API
+USER_BATCH_API_INIT = 'USER_BATCH_API_INIT'
+USER_BATCH_API_SUCCESS = 'USER_BATCH_API_SUCCESS'
+USER_BATCH_API_ERROR = 'USER_BATCH_API_ERROR'
+
+# User Bulk Update API
+USER_BULK_UPDATE_API_INIT = 'USER_BULK_UPDATE_API_INIT'
+USER_BULK_UPDATE_API_SUCCESS = 'USER_BULK_UPDATE_API_SUCCESS'
+USER_BULK_UPDATE_API_ERROR = 'USER_BULK_UPDATE_API_ERROR'
+USER_BULK_UPDATE_BATCH = 'USER_BULK_UPDATE_BATCH'
+
+# User Import API
+USER_IMPORT_API_INIT = 'USER_IMPORT_API_INIT'
+USER_IMPORT_API_SUCCESS = 'USER_IMPORT_API_SUCCESS'
+USER_IMPORT_API_ERROR = 'USER_IMPORT_API_ERROR'
+USER_IMPORT_STATUS_API_INIT = 'USER_IMPORT_STATUS_API_INIT'
+USER_IMPORT_STATUS_API_SUCCESS = 'USER_IMPORT_STATUS_API_SUCCESS'
+
+# User Import Job
+USER_IMPORT_JOB_START = 'USER_IMPORT_JOB_START'
+USER_IMPORT_JOB_FINISH = 'USER_IMPORT_JOB_FINISH'
+USER_IMPORT_JOB_ERROR = 'USER_IMPORT_JOB_ERROR'
+USER_IMPORT_JOB_STALE = 'USER_IMPORT_JOB_STALE'
+
+# User Changes API
+USER_CHANGES_API_INIT = 'USER_CHANGES_API_INIT'
+USER_CHANGES_API_SUCCESS = 'USER_CHANGES_API_SUCCESS'
+USER_CHANGES_API_ERROR = 'USER_CHANGES_API_ERROR'
+
+# Purge Deleted Users Command
+USER_PURGE_BATCH = 'USER_PURGE_BATCH'
+
+# Purge User Changes Command
+USER_CHANGES_PURGE_BATCH = 'USER_CHANGES_PURGE_BATCH'
+
+# User Activity Tracker
+USER_ACTIVITY_FLUSH = 'USER_ACTIVITY_FLUSH'
+USER_ACTIVITY_FLUSH_ERROR = 'USER_ACTIVITY_FLUSH_ERROR'
@@ -0,0 +1,120 @@
+import functools
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+
+from .utils import response
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+
+
+def cache_key(request, key):
+    """
+    Cache key of the stored response of an idempotency key, scoped to the method and path of the request
+    :param request:
+    :param key: Idempotency-Key header value
+    :return:
+    """
+    digest = hashlib.sha256(('%s %s %s' % (request.method, request.path, key)).encode()).hexdigest()
+    return 'idempotency:%s' % digest
+
+
+def fingerprint(request):
+    """
+    Digest of the request data, a key reused with other data is rejected
+    Uploaded files are represented by their name.
+    :param request:
+    :return:
+    """
+    data = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def replay(stored, request_fingerprint):
+    """
+    Response of a retry from the stored first response
+    :param stored:
+    :param request_fingerprint: Fingerprint of the retry
+    :return:
+    """
+    if stored['fingerprint'] != request_fingerprint:
+        message = _('This key was already used with a different request.')
+        return response(errors={'idempotency_key': [message]}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    result = response(data=stored['data'], errors=stored['errors'], status=stored['status'], headers=stored['headers'])
+    result['Idempotent-Replayed'] = 'true'
+    return result
+
+
+def idempotent(handler):
+    """
+    Make a viewset handler idempotent for requests with an Idempotency-Key header
+    The first response with a status below 500 is stored in the cache for IDEMPOTENCY_KEY_TTL seconds and retries with
+    the same key are answered from it without calling the handler. A request arriving while the first one is still
+    handled waits up to IDEMPOTENCY_WAIT_TIMEOUT seconds for its response. Use a cache shared by all the processes, e.g.
+    Memcached or Redis, for the keys to work across them.
+    :param handler:
+    :return:
+    """
+
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if key is None:
+            return handler(view, request, *args, **kwargs)
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            message = _('Ensure this header has 1 to %d characters.') % MAX_KEY_LENGTH
+            return response(errors={'idempotency_key': [message]}, status=status.HTTP_400_BAD_REQUEST)
+
+        stored_key = cache_key(request, key)
+        lock_key = '%s:lock' % stored_key
+        request_fingerprint = fingerprint(request)
+        # Identifies the lock of this request, it may expire and be taken by another one while the handler runs
+        lock_token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+        while True:
+            stored = cache.get(stored_key)
+            if stored is not None:
+                return replay(stored, request_fingerprint)
+
+            if cache.add(lock_key, lock_token, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                break
+
+            # A request with the same key is being handled, wait for its response
+            if time.monotonic() >= deadline:
+                return response(errors={'idempotency_key': [_('A request with this key is in progress.')]},
+                                status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'})
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+        try:
+            # The response may have been stored between the check and the lock
+            stored = cache.get(stored_key)
+            if stored is not None:
+                return replay(stored, request_fingerprint)
+
+            result = handler(view, request, *args, **kwargs)
+            if result.status_code < 500:
+                cache.set(stored_key, {
+                    'fingerprint': request_fingerprint,
+                    'status': result.status_code,
+                    'data': result.data['data'],
+                    'errors': result.data['errors'],
+                    'headers': {header: value for header, value in result.items() if header.lower() != 'content-type'},
+                }, settings.IDEMPOTENCY_KEY_TTL)
+            return result
+        finally:
+            # The cache API has no compare and delete, the check only leaves a small window instead of the whole
+            # handler run
+            if cache.get(lock_key) == lock_token:
+                cache.delete(lock_key)
+
+    return wrapper
@@ -0,0 +1,174 @@
+import cProfile
+import re
+import time
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import profiling
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPT_ENCODING_RE = re.compile(r'^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+# Text based content types, images and other binary types are already compressed
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+                      'application/yaml')
+
+
+def accepted_encodings(header):
+    """
+    Encodings of an Accept-Encoding header with their quality value
+    :param header:
+    :return:
+    """
+    encodings = {}
+    for item in header.split(','):
+        match = ACCEPT_ENCODING_RE.match(item)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            quality = 0.0
+        encodings[match.group(1).lower()] = quality
+    return encodings
+
+
+def negotiate(header):
+    """
+    Supported encoding with the highest quality value in an Accept-Encoding header, brotli wins a tie
+    :param header:
+    :return: br, gzip or None
+    """
+    encodings = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for encoding in ('br', 'gzip') if brotli else ('gzip',):
+        quality = encodings.get(encoding, encodings.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def gzip_compressor():
+    """
+    Compressor writing the gzip format at COMPRESSION_GZIP_LEVEL
+    :return:
+    """
+    return zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress(encoding, content):
+    """
+    Compress a whole response body
+    :param encoding: br or gzip
+    :param content:
+    :return:
+    """
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    compressor = gzip_compressor()
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_stream(encoding, chunks):
+    """
+    Compress a streamed response body, every chunk is flushed so the client receives it without waiting for the next
+    :param encoding: br or gzip
+    :param chunks:
+    :return:
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = gzip_compressor()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress text responses with brotli or gzip, whichever the Accept-Encoding header of the client prefers
+    Responses smaller than COMPRESSION_MIN_SIZE bytes are sent as they are, the gain would not pay for the CPU time.
+    Streaming responses are compressed chunk by chunk. Brotli is used when the brotli package is installed.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(encoding, response.streaming_content)
+            # The length of the compressed stream is unknown
+            del response['Content-Length']
+        else:
+            content = compress(encoding, response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed body is another representation, a strong ETag would claim the bytes are the same
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_compressible(response):
+        """
+        Whether the content type of the response is text
+        :param response:
+        :return:
+        """
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return (content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES or
+                content_type.endswith('+json') or content_type.endswith('+xml'))
+
+
+class ProfilingMiddleware:
+    """
+    Run a sample of the requests under cProfile and keep the slowest profiles, see service.profiling
+    Add it last so the profile covers the view, its queries and the rendering of the response without the other
+    middleware. Requests which are not sampled only pay for a random number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - start
+
+        profiler.create_stats()
+        profile_id = profiling.store(profiler.stats, request, response.status_code, duration)
+        if profile_id is not None:
+            response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework import pagination
+from rest_framework.settings import api_settings
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    """
+    Limit offset pagination with an upper bound
+    The default limit is the `PAGE_SIZE` of the REST framework settings and a larger limit than `PAGINATION_MAX_LIMIT`
+    is clamped to it, so a single request cannot load and serialize the whole table. The next link of a clamped page
+    carries the applied limit. Both are read on every request so settings overrides are honoured.
+    """
+
+    @property
+    def max_limit(self):
+        return settings.PAGINATION_MAX_LIMIT
+
+    @property
+    def default_limit(self):
+        return min(api_settings.PAGE_SIZE, self.max_limit)
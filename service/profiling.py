@@ -0,0 +1,172 @@
+import hmac
+import marshal
+import os
+import random
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+CACHE_ALIAS = 'profiling'
+INDEX_KEY = 'profiling:index'
+HEADER = 'HTTP_X_PROFILE'
+TOKEN_HEADER = 'HTTP_X_PROFILING_TOKEN'
+
+
+def profile_cache():
+    """
+    Cache the profiles are kept in
+    :return:
+    """
+    return caches[CACHE_ALIAS]
+
+
+def is_process_local():
+    """
+    Whether the profile cache is only seen by the process which stored the profiles
+    :return:
+    """
+    return isinstance(profile_cache(), (LocMemCache, DummyCache))
+
+
+def cache_key(profile_id):
+    """
+    Cache key of the stats of a profile
+    :param profile_id:
+    :return:
+    """
+    return 'profiling:profile:%s' % profile_id
+
+
+def has_token(request):
+    """
+    Whether PROFILING_TOKEN is set and the X-Profiling-Token header matches it
+    :param request:
+    :return:
+    """
+    token = request.META.get(TOKEN_HEADER, '')
+    return bool(settings.PROFILING_TOKEN) and hmac.compare_digest(token.encode(), settings.PROFILING_TOKEN.encode())
+
+
+def should_profile(request):
+    """
+    Whether to profile a request, a PROFILING_SAMPLE_RATE fraction of the requests is sampled and with
+    PROFILING_HEADER_ENABLED a request with the X-Profile: 1 and a valid X-Profiling-Token header is always profiled
+    :param request:
+    :return:
+    """
+    if settings.PROFILING_HEADER_ENABLED and request.META.get(HEADER) == '1' and has_token(request):
+        return True
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def profiles():
+    """
+    Stored profiles, slowest first
+    :return:
+    """
+    return profile_cache().get(INDEX_KEY, [])
+
+
+def get_stats(profile_id):
+    """
+    pstats data of a stored profile
+    :param profile_id:
+    :return: None when the profile was dropped
+    """
+    return profile_cache().get(cache_key(profile_id))
+
+
+def store(stats, request, status, duration):
+    """
+    Keep a profile when it is one of the PROFILING_MAX_PROFILES slowest
+    The index and the stats of each profile are separate cache entries, so listing the profiles does not load them.
+    Concurrent writers may drop a profile of each other, which is acceptable for samples.
+    :param stats: pstats data, e.g. Profile.stats after create_stats
+    :param request:
+    :param status: Response status code
+    :param duration: Seconds
+    :return: Id of the stored profile, None when it was not slow enough
+    """
+    index = profiles()
+    if len(index) >= settings.PROFILING_MAX_PROFILES and duration <= index[-1]['duration']:
+        return None
+
+    profile = {
+        'id': uuid.uuid4().hex,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': status,
+        'duration': round(duration, 6),
+        'created': timezone.now().isoformat(),
+    }
+    cache = profile_cache()
+    cache.set(cache_key(profile['id']), stats, settings.PROFILING_TIMEOUT)
+
+    index = sorted(index + [profile], key=lambda item: item['duration'], reverse=True)
+    cache.set(INDEX_KEY, index[:settings.PROFILING_MAX_PROFILES], settings.PROFILING_TIMEOUT)
+    cache.delete_many([cache_key(item['id']) for item in index[settings.PROFILING_MAX_PROFILES:]])
+    return profile['id']
+
+
+def dump_pstats(stats):
+    """
+    Profile in the file format of pstats.Stats.dump_stats, readable by pstats, snakeviz or flameprof
+    :param stats:
+    :return:
+    """
+    return marshal.dumps(stats)
+
+
+def label(func):
+    """
+    Frame name of a pstats function key
+    :param func: File name, line number and function name
+    :return:
+    """
+    filename, line, name = func
+    if filename == '~':
+        # Built-in functions
+        return name.replace(';', ':')
+    return ('%s (%s:%d)' % (name, os.path.basename(filename), line)).replace(';', ':')
+
+
+def dump_collapsed(stats, max_depth=64):
+    """
+    Profile as collapsed stacks, one `frame;frame;frame microseconds` line per stack, the input of flamegraph.pl or
+    speedscope
+    cProfile records callers and not whole stacks, so the time of a function called from several places is split
+    between its callers by their share of its cumulative time.
+    :param stats:
+    :param max_depth: Deeper stacks are cut off
+    :return:
+    """
+    children = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    totals = {}
+
+    def walk(func, stack, scale):
+        stack = stack + (label(func),)
+        own = stats[func][2] * scale * 1e6
+        if own >= 1:
+            totals[';'.join(stack)] = totals.get(';'.join(stack), 0) + own
+        if len(stack) >= max_depth:
+            return
+        for child, cumulative in children.get(func, ()):
+            child_total = stats[child][3]
+            # Recursive calls are folded into the outer call, branches below a microsecond are left out
+            if cumulative * scale * 1e6 < 1 or label(child) in stack:
+                continue
+            walk(child, stack, scale * min(cumulative / child_total, 1))
+
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if not callers:
+            walk(func, (), 1)
+
+    return ''.join('%s %d\n' % (stack, value) for stack, value in totals.items())
@@ -0,0 +1,15 @@
+import os
+
+from django.test.runner import DiscoverRunner, default_test_processes
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner running the tests in parallel by default
+    The number of processes is TEST_PARALLEL, one per CPU when it is not set. --parallel on the command line wins.
+    """
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=int(os.getenv('TEST_PARALLEL', 0)) or default_test_processes())
@@ -0,0 +1,40 @@
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+info = openapi.Info(
+    title="Users API",
+    default_version='v1',
+    description="User Service API",
+    terms_of_service="",
+    contact=openapi.Contact(email="parthij15@gmail.com"),
+    license=openapi.License(name="Apache License"),
+)
+
+schema_view = get_schema_view(
+    info,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+
+def generate_schema():
+    """
+    Generate the OpenAPI schema of the API like the schema view, without the host of a request
+    :return: JSON encoded schema
+    """
+    generator = schema_view.generator_class(info)
+    return OpenAPICodecJson(validators=[], pretty=True).encode(generator.get_schema(request=None, public=True))
+
+
+def write_schema(path):
+    """
+    Generate the OpenAPI schema into a file
+    :param path:
+    :return: JSON encoded schema
+    """
+    content = generate_schema()
+    with open(path, 'wb') as schema_file:
+        schema_file.write(content)
+    return content
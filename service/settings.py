@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -48,14 +49,32 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'service.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'service.middleware.ProfilingMiddleware',
 ]
 
+# Response compression, bodies smaller than the minimum size (bytes) are not compressed.
+# Brotli is used when the brotli package is installed and the client prefers it.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+# Request profiling, a fraction (0 to 1) of the requests is run under cProfile and the slowest profiles are kept in the
+# profiling cache for the timeout (seconds). With the header enabled, a request with the X-Profile: 1 header and an
+# X-Profiling-Token header matching the token is profiled too. The profiles are listed at /profiles for requests with
+# the token header, and dumped with the dump_profiles command.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_HEADER_ENABLED = int(os.getenv('PROFILING_HEADER_ENABLED', 0))
+PROFILING_MAX_PROFILES = int(os.getenv('PROFILING_MAX_PROFILES', 20))
+PROFILING_TIMEOUT = int(os.getenv('PROFILING_TIMEOUT', 86400))
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+
 ROOT_URLCONF = 'service.urls'
 
 TEMPLATES = [
@@ -112,6 +131,40 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+    # Request profiles, files by default so the dump_profiles command reads the profiles of the server processes.
+    # Use a shared cache, e.g. Memcached or Redis, when the server runs on several hosts.
+    'profiling': {
+        'BACKEND': os.getenv('PROFILING_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('PROFILING_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'service-profiles')),
+    },
+}
+
+# Idempotency-Key header, seconds the first response is kept, seconds a request holds the key while it is handled and
+# seconds a concurrent request with the same key waits for that response (checked every poll interval)
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 86400))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', 30))
+IDEMPOTENCY_WAIT_TIMEOUT = int(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', 10))
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv('IDEMPOTENCY_POLL_INTERVAL', 0.05))
+
+# Password hashing
+# https://docs.djangoproject.com/en/3.0/topics/auth/passwords/
+
+# PBKDF2 iterations of new passwords, passwords with another count are rehashed on login
+PASSWORD_HASHER_ITERATIONS = int(os.getenv('PASSWORD_HASHER_ITERATIONS', 216000))
+
+PASSWORD_HASHERS = [
+    'users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.0/topics/i18n/
 
@@ -185,18 +238,125 @@ LOGGING = {
 # Django REST framework settings
 # https://www.django-rest-framework.org/api-guide/settings/
 
+# Largest page a list request may ask for with the limit parameter, larger limits are clamped to it
+PAGINATION_MAX_LIMIT = int(os.getenv('PAGINATION_MAX_LIMIT', 100))
+
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
+    'DEFAULT_PAGINATION_CLASS': 'service.pagination.LimitOffsetPagination',
+    'PAGE_SIZE': int(os.getenv('PAGE_SIZE', 10)),
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'EXCEPTION_HANDLER': 'service.utils.custom_exception_handler',
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
+    'DEFAULT_THROTTLE_RATES': {
+        # Per client IP address
+        'client': os.getenv('THROTTLE_RATE_CLIENT', '600/min'),
+        # Per client IP address and users API action, create is expensive because of the password hashing
+        'user.create': os.getenv('THROTTLE_RATE_USER_CREATE', '30/min'),
+        'user.list': os.getenv('THROTTLE_RATE_USER_LIST', '120/min'),
+        'user.retrieve': os.getenv('THROTTLE_RATE_USER_RETRIEVE', None),
+        'user.update': os.getenv('THROTTLE_RATE_USER_UPDATE', '60/min'),
+        'user.partial_update': os.getenv('THROTTLE_RATE_USER_UPDATE', '60/min'),
+        'user.destroy': os.getenv('THROTTLE_RATE_USER_DESTROY', '60/min'),
+        'user.login': os.getenv('THROTTLE_RATE_USER_LOGIN', '10/min'),
+        'user.search': os.getenv('THROTTLE_RATE_USER_SEARCH', '120/min'),
+        'user.batch': os.getenv('THROTTLE_RATE_USER_BATCH', '120/min'),
+        'user.bulk_update': os.getenv('THROTTLE_RATE_USER_BULK_UPDATE', '10/min'),
+        'user.create_import': os.getenv('THROTTLE_RATE_USER_IMPORT', '5/min'),
+        'user.changes': os.getenv('THROTTLE_RATE_USER_CHANGES', '120/min'),
+    },
+    # Number of proxies in front of the service, the client IP address is taken from X-Forwarded-For behind them.
+    # Without proxies the throttles key on REMOTE_ADDR, so a client cannot pick its own key with the header.
+    'NUM_PROXIES': int(os.getenv('THROTTLE_NUM_PROXIES', 0)),
+}
+
+# API documentation
+# https://drf-yasg.readthedocs.io/en/stable/settings.html
+
+# Pre-generated OpenAPI schema, regenerate it with the generate_openapi_schema command after API changes
+OPENAPI_SCHEMA_FILE = os.path.join(BASE_DIR, 'service', 'openapi.json')
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv('OPENAPI_SCHEMA_MAX_AGE', 86400))
+
+# The documentation UIs load the pre-generated schema
+SWAGGER_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
 }
 
 # ImageField use_url value
 # https://www.django-rest-framework.org/api-guide/fields/#imagefield
 
 UPLOADED_FILES_USE_URL = int(os.getenv('UPLOADED_FILES_USE_URL', 0))
+
+# Users app
+
+# UUID version of new user ids, 4 (random) or 7 (time ordered, better insert locality)
+USER_ID_VERSION = int(os.getenv('USER_ID_VERSION', 4))
+
+# Store user ids as binary(16) instead of char(32) on MySQL.
+# Set it before running the users migrations, they copy the converted ids in batches of USER_ID_BINARY_BATCH_SIZE and
+# then swap the primary key, which rebuilds the table. Changing it afterwards needs migrating users back to 0003 with
+# the old value first, the first database connection fails when it does not match the stored ids.
+USER_ID_BINARY = int(os.getenv('USER_ID_BINARY', 0))
+USER_ID_BINARY_BATCH_SIZE = int(os.getenv('USER_ID_BINARY_BATCH_SIZE', 1000))
+
+# Mark deleted users with deleted_at instead of deleting the rows
+USER_SOFT_DELETE = int(os.getenv('USER_SOFT_DELETE', 1))
+
+# Soft deleted users older than this are removed by the purge_deleted_users command
+USER_PURGE_AFTER_DAYS = int(os.getenv('USER_PURGE_AFTER_DAYS', 30))
+USER_PURGE_BATCH_SIZE = int(os.getenv('USER_PURGE_BATCH_SIZE', 500))
+
+# Last login tracking, the times are buffered in memory and written with one UPDATE at most flush interval (seconds)
+# after they were recorded. Users whose last login is less than rewrite after (seconds) old are skipped by the flush.
+USER_ACTIVITY_FLUSH_INTERVAL = int(os.getenv('USER_ACTIVITY_FLUSH_INTERVAL', 30))
+USER_ACTIVITY_REWRITE_AFTER = int(os.getenv('USER_ACTIVITY_REWRITE_AFTER', 60))
+USER_ACTIVITY_MAX_PENDING = int(os.getenv('USER_ACTIVITY_MAX_PENDING', 500))
+
+# Login tokens, signed with USER_TOKEN_SECRET_KEY so other services can validate them without the database
+USER_TOKEN_SECRET_KEY = os.getenv('USER_TOKEN_SECRET_KEY', SECRET_KEY)
+USER_TOKEN_MAX_AGE = int(os.getenv('USER_TOKEN_MAX_AGE', 3600))
+
+# Seconds a serialized user is cached, e.g. for the token verification
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', 60))
+
+# Ids accepted per batch retrieve request
+USER_BATCH_MAX_IDS = int(os.getenv('USER_BATCH_MAX_IDS', 100))
+
+# User search, results per request and the candidates checked per query. A query whose rarest trigram is found more
+# than the common token count times is answered with a contains scan instead of the trigram index.
+USER_SEARCH_DEFAULT_LIMIT = int(os.getenv('USER_SEARCH_DEFAULT_LIMIT', 10))
+USER_SEARCH_MAX_LIMIT = int(os.getenv('USER_SEARCH_MAX_LIMIT', 50))
+USER_SEARCH_MAX_CANDIDATES = int(os.getenv('USER_SEARCH_MAX_CANDIDATES', 500))
+USER_SEARCH_COMMON_TOKEN_COUNT = int(os.getenv('USER_SEARCH_COMMON_TOKEN_COUNT', 5000))
+
+# The admin change list takes the count of the unfiltered users table from the MySQL or PostgreSQL table statistics
+# once they estimate at least this many rows, instead of counting them
+USER_ADMIN_ESTIMATE_THRESHOLD = int(os.getenv('USER_ADMIN_ESTIMATE_THRESHOLD', 100000))
+
+# Bulk user updates, users updated per UPDATE and ids or usernames accepted per filter
+USER_BULK_UPDATE_BATCH_SIZE = int(os.getenv('USER_BULK_UPDATE_BATCH_SIZE', 1000))
+USER_BULK_UPDATE_MAX_ITEMS = int(os.getenv('USER_BULK_UPDATE_MAX_ITEMS', 10000))
+
+# User imports, rows validated and inserted per chunk, threads hashing the passwords of a chunk, background import
+# threads per process (0 leaves the jobs to the process_user_imports command) and row errors kept per job.
+# A running job without progress for the stale after seconds lost its worker, e.g. to a restart, and is failed.
+USER_IMPORT_CHUNK_SIZE = int(os.getenv('USER_IMPORT_CHUNK_SIZE', 500))
+USER_IMPORT_HASH_WORKERS = int(os.getenv('USER_IMPORT_HASH_WORKERS', 4))
+USER_IMPORT_WORKERS = int(os.getenv('USER_IMPORT_WORKERS', 1))
+USER_IMPORT_MAX_ERRORS = int(os.getenv('USER_IMPORT_MAX_ERRORS', 1000))
+USER_IMPORT_STALE_AFTER = int(os.getenv('USER_IMPORT_STALE_AFTER', 600))
+
+# User change feed, changes per request, the long poll wait and check interval (seconds), the time a change is held
+# back so transactions committing slightly out of id order are not skipped (seconds) and the days changes are kept
+USER_CHANGES_DEFAULT_LIMIT = int(os.getenv('USER_CHANGES_DEFAULT_LIMIT', 100))
+USER_CHANGES_MAX_LIMIT = int(os.getenv('USER_CHANGES_MAX_LIMIT', 1000))
+USER_CHANGES_MAX_WAIT = int(os.getenv('USER_CHANGES_MAX_WAIT', 25))
+USER_CHANGES_POLL_INTERVAL = float(os.getenv('USER_CHANGES_POLL_INTERVAL', 0.5))
+USER_CHANGES_SETTLE_TIME = float(os.getenv('USER_CHANGES_SETTLE_TIME', 1))
+USER_CHANGES_RETENTION_DAYS = int(os.getenv('USER_CHANGES_RETENTION_DAYS', 7))
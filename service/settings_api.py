@@ -0,0 +1,30 @@
+"""
+API only settings profile for service project.
+
+The service is a stateless JSON API, so this profile drops the admin, sessions, messages, CSRF, static files and the
+API documentation to reduce the worker start up time and memory.
+Select it with DJANGO_SETTINGS_MODULE=service.settings_api
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'users.apps.UsersConfig',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'service.middleware.CompressionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'service.middleware.ProfilingMiddleware',
+]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = dict(
+    REST_FRAMEWORK,
+    DEFAULT_RENDERER_CLASSES=['rest_framework.renderers.JSONRenderer'],
+    DEFAULT_AUTHENTICATION_CLASSES=[],
+    UNAUTHENTICATED_USER=None,
+)
@@ -0,0 +1,46 @@
+"""
+Test settings profile for service project.
+
+The tests run against an in-memory SQLite database with a fast password hasher, so they need no database server and
+creating a user does not cost a PBKDF2 hash. manage.py selects this profile for the test command. Set
+TEST_DATABASE=mysql to run the tests, including the MySQL specific ones, against the MySQL database of the base
+settings. The tests run in TEST_PARALLEL processes, one per CPU by default.
+"""
+import os
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, PASSWORD_HASHERS, SECRET_KEY
+
+SECRET_KEY = SECRET_KEY or 'test'
+
+if os.getenv('TEST_DATABASE', 'sqlite') != 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+
+# The tests that check the hashing select the PBKDF2 hashers with override_settings
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher'] + PASSWORD_HASHERS
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'profiling': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='service-test-profiles-'),
+    },
+}
+
+# Uploaded avatars and import files do not end up in the media directory of the project
+MEDIA_ROOT = tempfile.mkdtemp(prefix='service-test-media-')
+
+PROFILING_SAMPLE_RATE = 0
+
+# Logins write last_login right away, so no flush timer thread outlives a test
+USER_ACTIVITY_FLUSH_INTERVAL = 0
+
+TEST_RUNNER = 'service.runner.TestRunner'
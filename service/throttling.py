@@ -0,0 +1,127 @@
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding window counter throttle
+    Keeps a single counter per client and fixed window in the cache. The previous window is weighted by the part of it
+    that still overlaps the sliding window, so a check costs one `get_many` and one `incr` instead of reading and
+    rewriting the whole request history like `SimpleRateThrottle` does.
+    Rates are looked up by scope in `DEFAULT_THROTTLE_RATES`, a scope without a rate is not throttled.
+    """
+
+    def __init__(self):
+        # The scope may depend on the view, so the rate is resolved in `allow_request`
+        self.rate = None
+        self.num_requests = self.duration = None
+        self.counts = (0, 0)
+        self.elapsed = 0
+
+    def get_scope(self, view):
+        """
+        Throttle scope of the request
+        :param view:
+        :return:
+        """
+        return self.scope
+
+    def get_rate(self):
+        """
+        Rate of the current scope, read on every request so settings overrides are honoured
+        :return:
+        """
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        """
+        Cache key prefix of the client, the window number is appended to it
+        :param request:
+        :param view:
+        :return:
+        """
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+    def allow_request(self, request, view):
+        """
+        Check the weighted request count of the sliding window and count the request if it is allowed
+        :param request:
+        :param view:
+        :return:
+        """
+        self.scope = self.get_scope(view)
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        current_key = '%s:%d' % (self.key, window)
+        previous_key = '%s:%d' % (self.key, window - 1)
+
+        counts = self.cache.get_many([previous_key, current_key])
+        self.counts = (counts.get(previous_key, 0), counts.get(current_key, 0))
+        self.elapsed = now - window * self.duration
+
+        previous, current = self.counts
+        if previous * (1 - self.elapsed / self.duration) + current >= self.num_requests:
+            return self.throttle_failure()
+
+        # Keep the counter for two windows, it is read back as the previous window count
+        if not self.cache.add(current_key, 1, self.duration * 2):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add and incr
+                self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        """
+        Seconds until the weighted request count drops below the limit again
+        :return: None when the rate allows no requests at all
+        """
+        if self.num_requests == 0:
+            # A rate of 0 blocks the scope, waiting does not help
+            return None
+
+        previous, current = self.counts
+        remaining = self.duration - self.elapsed
+
+        if current >= self.num_requests:
+            # The current window becomes the previous one and has to decay below the limit
+            return remaining + self.duration * (1 - self.num_requests / current)
+        if not previous:
+            return remaining
+
+        return max(self.duration * (1 - (self.num_requests - current) / previous) - self.elapsed, 0)
+
+
+class ClientRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits the overall request rate of a client IP address
+    """
+    scope = 'client'
+
+
+class ActionRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits the request rate of a client IP address per viewset action.
+    The scope is `<basename>.<action>`, e.g. `user.create`.
+    """
+
+    def get_scope(self, view):
+        """
+        Throttle scope of the viewset action
+        :param view:
+        :return:
+        """
+        return '%s.%s' % (getattr(view, 'basename', None), getattr(view, 'action', None))
@@ -13,35 +13,58 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.apps import apps
+from django.conf import settings
 from django.conf.urls import url
 from django.conf.urls.static import static
-from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-from service.settings import MEDIA_ROOT, MEDIA_URL
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Users API",
-        default_version='v1',
-        description="User Service API",
-        terms_of_service="",
-        contact=openapi.Contact(email="parthij15@gmail.com"),
-        license=openapi.License(name="Apache License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+
+from service.views import openapi_schema, profile_detail, profile_list
+
+
+def schema_view(renderer, **kwargs):
+    """
+    API documentation UI view built on the first request
+    drf_yasg and the schema view are only imported once the documentation is used.
+    :param renderer: swagger or redoc
+    :param kwargs:
+    :return:
+    """
+    view = None
+
+    def lazy_view(request, *args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            from service.schema import schema_view as view_class
+            view = view_class.with_ui(renderer, **kwargs)
+        return view(request, *args, **view_kwargs)
+
+    return lazy_view
+
 
 urlpatterns = [
-                  path('', include('users.urls')),
-                  path('admin/', admin.site.urls),
-                  path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
-                  url(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0),
-                      name='schema-json'),
-                  url(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-                  url(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-              ] + static(MEDIA_URL, document_root=MEDIA_ROOT)
+    path('', include('users.urls')),
+    path('profiles', profile_list, name='profile-list'),
+    path('profiles/<str:profile_id>', profile_detail, name='profile-detail'),
+]
+
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns += [
+        path('admin/', admin.site.urls),
+    ]
+
+if apps.is_installed('django.contrib.sessions'):
+    urlpatterns += [
+        path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
+    ]
+
+if apps.is_installed('drf_yasg'):
+    urlpatterns += [
+        url(r'^swagger(?P<format>\.json|\.yaml)$', openapi_schema, name='schema-json'),
+        url(r'^swagger/$', schema_view('swagger', cache_timeout=0), name='schema-swagger-ui'),
+        url(r'^redoc/$', schema_view('redoc', cache_timeout=0), name='schema-redoc'),
+    ]
+
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,3 +1,7 @@
+import os
+import time
+import uuid
+
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import exception_handler
@@ -14,8 +18,11 @@ def custom_exception_handler(exc, context):
     exc_response = exception_handler(exc, context)
 
     # Now add the errors and data to the response.
+    # Keep the headers set by the default handler, e.g. Retry-After of throttled requests.
     if exc_response is not None:
-        return response(errors=exc_response.data, status=exc.status_code)
+        headers = {header: exc_response[header] for header in ('WWW-Authenticate', 'Retry-After') if
+                   exc_response.has_header(header)}
+        return response(errors=exc_response.data, status=exc.status_code, headers=headers or None)
 
     return exc_response
 
@@ -35,3 +42,16 @@ def response(**kwargs):
     headers = kwargs.get('headers', None)
 
     return Response(data=response_data, status=response_status, headers=headers)
+
+
+def uuid7():
+    """
+    Time ordered UUID (version 7)
+    48 bits of Unix time in milliseconds followed by the version, variant and random bits. New values sort after the
+    older ones, so inserts go to the end of a B-tree index instead of random pages.
+    :return:
+    """
+    value = int(time.time() * 1000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xf << 76) | 7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
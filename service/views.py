@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+
+from . import profiling
+
+_schemas = {}
+
+
+def load_schema():
+    """
+    Pre-generated OpenAPI schema, read from OPENAPI_SCHEMA_FILE once per process
+    The file is generated when it is missing, afterwards only the generate_openapi_schema command regenerates it.
+    :return:
+    """
+    if 'json' not in _schemas:
+        if not os.path.exists(settings.OPENAPI_SCHEMA_FILE):
+            from service.schema import write_schema
+            write_schema(settings.OPENAPI_SCHEMA_FILE)
+
+        with open(settings.OPENAPI_SCHEMA_FILE, 'rb') as schema_file:
+            content = schema_file.read()
+        _schemas.update(json=content, etag=hashlib.sha1(content).hexdigest())
+    return _schemas
+
+
+def schema_etag(request, format):
+    """
+    ETag of the schema representation
+    :param request:
+    :param format:
+    :return:
+    """
+    return '%s%s' % (load_schema()['etag'], format)
+
+
+@require_safe
+@condition(etag_func=schema_etag)
+def openapi_schema(request, format):
+    """
+    Serve the pre-generated OpenAPI schema as JSON or YAML with long cache headers
+    :param request:
+    :param format: .json or .yaml
+    :return:
+    """
+    schemas = load_schema()
+
+    if format == '.yaml':
+        if 'yaml' not in schemas:
+            from drf_yasg.codecs import yaml_sane_dump
+            schemas['yaml'] = yaml_sane_dump(json.loads(schemas['json'], object_pairs_hook=OrderedDict), binary=True)
+        schema_response = HttpResponse(schemas['yaml'], content_type='application/yaml')
+    else:
+        schema_response = HttpResponse(schemas['json'], content_type='application/json')
+
+    patch_cache_control(schema_response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return schema_response
+
+
+def check_profiling_token(request):
+    """
+    Hide the profiles unless PROFILING_TOKEN is set and the X-Profiling-Token header matches it
+    :param request:
+    :return:
+    """
+    if not profiling.has_token(request):
+        raise Http404
+
+
+@require_safe
+def profile_list(request):
+    """
+    Stored request profiles, slowest first
+    :param request:
+    :return:
+    """
+    check_profiling_token(request)
+    return JsonResponse({'data': profiling.profiles(), 'errors': None})
+
+
+@require_safe
+def profile_detail(request, profile_id):
+    """
+    Download a stored request profile in the pstats format, or as collapsed stacks with ?format=collapsed
+    :param request:
+    :param profile_id:
+    :return:
+    """
+    check_profiling_token(request)
+    stats = profiling.get_stats(profile_id)
+    if stats is None:
+        raise Http404
+
+    if request.GET.get('format') == 'collapsed':
+        return HttpResponse(profiling.dump_collapsed(stats), content_type='text/plain')
+    profile_response = HttpResponse(profiling.dump_pstats(stats), content_type='application/octet-stream')
+    profile_response['Content-Disposition'] = 'attachment; filename="%s.prof"' % profile_id
+    return profile_response
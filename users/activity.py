@@ -0,0 +1,115 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, DateTimeField, Q, Value, When
+from django.utils import timezone
+
+from service import constants
+from .models import User
+
+
+class ActivityTracker:
+    """
+    Buffers the last seen time of the users in memory and writes them to last_login with one UPDATE per flush
+    Touches of the same user are coalesced to the latest time. The buffer is flushed by a timer thread at most
+    flush_interval seconds after the first buffered touch, or on a touch once the buffer holds max_pending users.
+    rewrite_after is not a staleness bound: users whose last_login is less than rewrite_after seconds old at the flush
+    are skipped, so a busy user costs at most one write per rewrite_after.
+    The rows are updated directly, so User.save is not involved.
+    """
+
+    def __init__(self, flush_interval=None, rewrite_after=None, max_pending=None, timer=time.monotonic):
+        self.flush_interval = settings.USER_ACTIVITY_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.rewrite_after = settings.USER_ACTIVITY_REWRITE_AFTER if rewrite_after is None else rewrite_after
+        self.max_pending = settings.USER_ACTIVITY_MAX_PENDING if max_pending is None else max_pending
+        self.timer = timer
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = timer()
+        self._flush_timer = None
+
+    def touch(self, user_id, when=None):
+        """
+        Record that the user was seen
+        :param user_id:
+        :param when: Defaults to now
+        :return:
+        """
+        when = when or timezone.now()
+        with self._lock:
+            if user_id not in self._pending or self._pending[user_id] < when:
+                self._pending[user_id] = when
+            due = (len(self._pending) >= self.max_pending or
+                   self.timer() - self._last_flush >= self.flush_interval)
+            if not due:
+                self._schedule_flush()
+
+        if due:
+            self.flush()
+
+    def _schedule_flush(self):
+        """
+        Start the flush timer unless one is already running, called with the lock held
+        :return:
+        """
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        """
+        Flush from the timer thread and close the database connections it opened
+        :return:
+        """
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+    def flush(self):
+        """
+        Write the buffered times with a single UPDATE
+        :return: Number of updated users
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = self.timer()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+        if not pending:
+            return 0
+
+        cutoff = timezone.now() - timedelta(seconds=self.rewrite_after)
+        try:
+            updated = User.all_objects.filter(
+                Q(last_login__isnull=True) | Q(last_login__lt=cutoff), pk__in=list(pending)
+            ).update(last_login=Case(
+                *[When(pk=user_id, then=Value(when)) for user_id, when in pending.items()],
+                output_field=DateTimeField()
+            ))
+        except Exception:
+            logging.exception('type=%s msg=%s' % (constants.USER_ACTIVITY_FLUSH_ERROR, 'User activity flush failed'))
+            # Keep the times for the next flush unless newer ones were recorded meanwhile
+            with self._lock:
+                for user_id, when in pending.items():
+                    if user_id not in self._pending or self._pending[user_id] < when:
+                        self._pending[user_id] = when
+                self._schedule_flush()
+            return 0
+
+        logging.debug('type=%s msg=%s data=%s' % (constants.USER_ACTIVITY_FLUSH, 'User activity flushed',
+                                                  {'pending': len(pending), 'updated': updated}))
+        return updated
+
+
+tracker = ActivityTracker()
+atexit.register(tracker.flush)
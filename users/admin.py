@@ -1,3 +1,243 @@
-from django.contrib import admin
+import uuid
 
-# Register your models here.
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _, ngettext
+
+from . import cache, changelog
+from .bulk import pk_batches
+from .models import User, UserChange
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which takes the row count of an unfiltered queryset from the table statistics of MySQL or PostgreSQL
+    instead of running COUNT(*) over the whole table. Filtered querysets, small tables and other databases are counted
+    exactly.
+    """
+
+    def estimate(self):
+        """
+        Estimated row count of the queryset table
+        :return: None when the database keeps no estimate
+        """
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                               'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', [table])
+            elif connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                               [connection.ops.quote_name(table)])
+            else:
+                return None
+            row = cursor.fetchone()
+
+        return int(row[0]) if row and row[0] is not None else None
+
+    @cached_property
+    def count(self):
+        """
+        Total number of objects, estimated for large unfiltered tables
+        :return:
+        """
+        if not self.object_list.query.where:
+            estimate = self.estimate()
+            if estimate is not None and estimate >= settings.USER_ADMIN_ESTIMATE_THRESHOLD:
+                return estimate
+        return super(EstimatedCountPaginator, self).count
+
+
+class UserChangeList(ChangeList):
+    """
+    Change list which loads the listed columns only
+    """
+
+    def get_queryset(self, request):
+        columns = {field.name for field in self.model._meta.concrete_fields}
+        fields = [name for name in self.list_display if name in columns]
+        return super(UserChangeList, self).get_queryset(request).only('pk', *fields)
+
+
+class DeletedListFilter(admin.SimpleListFilter):
+    """
+    Filter the users by their soft delete state, served by the deleted_at and created index
+    """
+    title = _('deleted')
+    parameter_name = 'deleted'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('0', _('No')),
+            ('1', _('Yes')),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() in ('0', '1'):
+            return queryset.filter(deleted_at__isnull=self.value() == '0')
+        return queryset
+
+
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    """
+    User admin for large tables
+    The change list estimates the total count, loads the listed columns only and filters on indexed columns.
+    The actions update the selected users with a single UPDATE, User.save is not involved.
+    """
+
+    list_display = ('username', 'email', 'first_name', 'last_name', 'is_active', 'created', 'last_login')
+    list_filter = ('is_active', DeletedListFilter)
+    list_per_page = 50
+    search_fields = ('^username', '=email')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    readonly_fields = ('id', 'last_login', 'created', 'updated', 'deleted_at')
+    actions = ('activate_users', 'deactivate_users', 'delete_users')
+
+    def get_queryset(self, request):
+        """
+        All users including the soft deleted ones
+        :param request:
+        :return:
+        """
+        queryset = User.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_changelist(self, request, **kwargs):
+        return UserChangeList
+
+    def get_readonly_fields(self, request, obj=None):
+        """
+        The stored password hash is not editable, a password is only set when adding a user
+        :param request:
+        :param obj:
+        :return:
+        """
+        if obj is None:
+            return self.readonly_fields
+        return self.readonly_fields + ('password',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Look a user id up by primary key, other terms by username prefix or exact email
+        :param request:
+        :param queryset:
+        :param search_term:
+        :return:
+        """
+        try:
+            user_id = uuid.UUID(search_term.strip())
+        except ValueError:
+            return super(UserAdmin, self).get_search_results(request, queryset, search_term)
+        return queryset.filter(pk=user_id), False
+
+    def get_actions(self, request):
+        """
+        Actions without delete_selected, which would load and delete the users one by one
+        :param request:
+        :return:
+        """
+        actions = super(UserAdmin, self).get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def update_users(self, request, queryset, message, change, **values):
+        """
+        Update the selected users with one UPDATE per batch of primary keys, log the changes and drop the users from
+        the cache
+        The selection may be all the users of a large table, so it is walked in batches of USER_BULK_UPDATE_BATCH_SIZE
+        primary keys like bulk_update does, a page of selected users is a single batch. Each batch commits on its own
+        with its change log entries.
+        :param request:
+        :param queryset:
+        :param message: Singular and plural message of the number of updated users
+        :param change: UserChange.Action logged for the users
+        :param values:
+        :return:
+        """
+        updated = 0
+        for pks in pk_batches(queryset, settings.USER_BULK_UPDATE_BATCH_SIZE):
+            with transaction.atomic():
+                updated += User.all_objects.filter(pk__in=pks).update(updated=timezone.now(), **values)
+                if change == UserChange.Action.DELETED:
+                    users = [User(pk=pk) for pk in pks]
+                else:
+                    users = User.all_objects.filter(pk__in=pks)
+                changelog.record(change, users)
+            cache.invalidate(*pks)
+        self.message_user(request, ngettext(*message, updated) % updated, messages.SUCCESS)
+
+    def activate_users(self, request, queryset):
+        self.update_users(request, queryset, ('%d user was activated.', '%d users were activated.'),
+                          UserChange.Action.UPDATED, is_active=True)
+    activate_users.short_description = _('Activate selected users')
+
+    def deactivate_users(self, request, queryset):
+        self.update_users(request, queryset, ('%d user was deactivated.', '%d users were deactivated.'),
+                          UserChange.Action.UPDATED, is_active=False)
+    deactivate_users.short_description = _('Deactivate selected users')
+
+    def delete_users(self, request, queryset):
+        """
+        Soft delete or delete the selected users in batches, like delete_model and the API do
+        :param request:
+        :param queryset:
+        :return:
+        """
+        message = ('%d user was deleted.', '%d users were deleted.')
+        if settings.USER_SOFT_DELETE:
+            self.update_users(request, queryset.filter(deleted_at__isnull=True), message, UserChange.Action.DELETED,
+                              is_active=False, deleted_at=timezone.now())
+            return
+
+        deleted = 0
+        for pks in pk_batches(queryset, settings.USER_BULK_UPDATE_BATCH_SIZE):
+            with transaction.atomic():
+                changelog.record(UserChange.Action.DELETED, [User(pk=pk) for pk in pks])
+                deleted += User.all_objects.filter(pk__in=pks).delete()[1].get(User._meta.label, 0)
+            cache.invalidate(*pks)
+        self.message_user(request, ngettext(*message, deleted) % deleted, messages.SUCCESS)
+    delete_users.short_description = _('Delete selected users')
+
+    def save_model(self, request, obj, form, change):
+        """
+        Save a user and log the change, a new password is hashed by User.save
+        :param request:
+        :param obj:
+        :param form:
+        :param change:
+        :return:
+        """
+        with transaction.atomic():
+            super(UserAdmin, self).save_model(request, obj, form, change)
+            changelog.record(UserChange.Action.UPDATED if change else UserChange.Action.CREATED, [obj])
+        cache.invalidate(obj.pk)
+
+    def delete_model(self, request, obj):
+        """
+        Soft delete or delete a user, like the API does
+        :param request:
+        :param obj:
+        :return:
+        """
+        # Deleting the row clears the primary key of the instance
+        user_id = obj.pk
+        with transaction.atomic():
+            changelog.record(UserChange.Action.DELETED, [obj])
+            if settings.USER_SOFT_DELETE:
+                obj.soft_delete()
+            else:
+                obj.delete()
+        cache.invalidate(user_id)
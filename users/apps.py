@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .fields import check_storage
+
+        connection_created.connect(check_storage, dispatch_uid='users.fields.check_storage')
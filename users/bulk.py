@@ -0,0 +1,92 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from service import constants
+from . import cache, changelog
+from .models import User, UserChange
+from .search import FIELDS, index_users
+
+
+def filter_users(ids=None, usernames=None, is_active=None, created_after=None, created_before=None):
+    """
+    Not deleted users matching all the given criteria
+    :param ids:
+    :param usernames:
+    :param is_active:
+    :param created_after:
+    :param created_before:
+    :return:
+    """
+    queryset = User.objects.all()
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    if usernames is not None:
+        queryset = queryset.filter(username__in=usernames)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+    if created_after is not None:
+        queryset = queryset.filter(created__gte=created_after)
+    if created_before is not None:
+        queryset = queryset.filter(created__lt=created_before)
+    return queryset
+
+
+def pk_batches(queryset, batch_size):
+    """
+    Primary keys of the users of a queryset in ascending batches, only one batch is held in memory
+    The next batch starts after the last key of the previous one, so users which stop matching the queryset meanwhile,
+    e.g. because a batch was updated, do not shift the batches.
+    :param queryset:
+    :param batch_size:
+    :return: Lists of up to batch_size primary keys
+    """
+    queryset = queryset.order_by('pk')
+    last = None
+    while True:
+        batch = queryset.filter(pk__gt=last) if last is not None else queryset
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks
+        if len(pks) < batch_size:
+            return
+        last = pks[-1]
+
+
+def bulk_update(queryset, values, dry_run=False, batch_size=None):
+    """
+    Set the values on the users of the queryset with one UPDATE per batch of primary keys
+    Users which already have all the values are left alone. Each batch commits on its own with its change log entries,
+    drops its users from the cache and reindexes them for the search when a searchable field changed. User.save is not
+    involved.
+    :param queryset: Users to update
+    :param values: New field values
+    :param dry_run: Only count the users
+    :param batch_size: Defaults to USER_BULK_UPDATE_BATCH_SIZE
+    :return: Number of matched users and of users which were (or would be) updated
+    """
+    batch_size = batch_size or settings.USER_BULK_UPDATE_BATCH_SIZE
+    matched = queryset.count()
+    changing = queryset.exclude(**values)
+    if dry_run:
+        return matched, changing.count()
+
+    reindex = set(values) & set(FIELDS)
+    updated = 0
+    for pks in pk_batches(changing, batch_size):
+        with transaction.atomic():
+            count = User.objects.filter(pk__in=pks).update(updated=timezone.now(), **values)
+            users = list(User.objects.filter(pk__in=pks))
+            if reindex:
+                index_users(users)
+            changelog.record(UserChange.Action.UPDATED, users)
+        cache.invalidate(*pks)
+
+        updated += count
+        logging.debug('type=%s msg=%s data=%s' % (constants.USER_BULK_UPDATE_BATCH, 'User batch updated',
+                                                  {'count': count, 'total': updated}))
+
+    return matched, updated
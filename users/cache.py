@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+def cache_key(user_id):
+    """
+    Cache key of a serialized user
+    :param user_id:
+    :return:
+    """
+    return 'users:user:%s' % user_id
+
+
+def get_users(user_ids):
+    """
+    Serialized users found in the cache
+    :param user_ids:
+    :return: Serialized users by id
+    """
+    cached = cache.get_many([cache_key(user_id) for user_id in user_ids])
+    return {str(user_id): cached[cache_key(user_id)] for user_id in user_ids if cache_key(user_id) in cached}
+
+
+def set_users(users):
+    """
+    Cache serialized users for USER_CACHE_TIMEOUT seconds
+    :param users: Serialized users
+    :return:
+    """
+    cache.set_many({cache_key(user['id']): user for user in users}, timeout=settings.USER_CACHE_TIMEOUT)
+
+
+def invalidate(*user_ids):
+    """
+    Remove users from the cache
+    :param user_ids:
+    :return:
+    """
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import UserChange
+from .serializers import UserSerializer
+
+
+def record(action, users):
+    """
+    Append changes of the users to the change log
+    Call it in the transaction writing the users, so the changes are committed or rolled back with them. The feed only
+    waits USER_CHANGES_SETTLE_TIME for a change to commit, so writes of many users commit batch by batch.
+    :param action: UserChange.Action
+    :param users:
+    :return:
+    """
+    UserChange.objects.bulk_create([
+        UserChange(user_id=user.pk, action=action,
+                   data=None if action == UserChange.Action.DELETED else UserSerializer(user).data)
+        for user in users
+    ])
+
+
+def read(since, limit, compact=False):
+    """
+    Changes after the cursor, oldest first
+    Changes younger than USER_CHANGES_SETTLE_TIME are held back, so a transaction which got a lower id but commits a
+    little later is not skipped by a consumer which already moved past it.
+    :param since: Cursor, the id of the last change the consumer has seen
+    :param limit:
+    :param compact: Keep only the latest change of each user in the batch
+    :return: Changes and whether more changes are available
+    """
+    settled = timezone.now() - timedelta(seconds=settings.USER_CHANGES_SETTLE_TIME)
+    rows = UserChange.objects.filter(pk__gt=since).order_by('pk')[:limit + 1]
+    # Stop at the first change which has not settled yet, the later ones are served after it
+    changes = list(takewhile(lambda change: change.created <= settled, rows))
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    if compact:
+        latest = {change.user_id: change for change in changes}
+        changes = sorted(latest.values(), key=lambda change: change.pk)
+    return changes, has_more
+
+
+def wait(since, limit, compact=False, timeout=0, timer=time.monotonic, sleep=time.sleep):
+    """
+    Changes after the cursor, waiting up to timeout seconds for the first ones
+    The change log is checked every USER_CHANGES_POLL_INTERVAL seconds with a primary key range query.
+    :param since:
+    :param limit:
+    :param compact:
+    :param timeout: Seconds to wait when there are no changes yet
+    :param timer:
+    :param sleep:
+    :return: Changes and whether more changes are available
+    """
+    deadline = timer() + timeout
+    while True:
+        changes, has_more = read(since, limit, compact)
+        remaining = deadline - timer()
+        if changes or remaining <= 0:
+            return changes, has_more
+        sleep(min(settings.USER_CHANGES_POLL_INTERVAL, remaining))
@@ -0,0 +1,86 @@
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.migrations.recorder import MigrationRecorder
+
+# Migration converting the stored ids to the format selected by USER_ID_BINARY
+STORAGE_MIGRATION = ('users', '0004_user_id_binary')
+
+# Connections whose id storage was checked, by alias
+_checked = set()
+
+
+class CompactUUIDField(models.UUIDField):
+    """
+    UUID field stored as binary(16) on MySQL when USER_ID_BINARY is on
+    MySQL stores a UUIDField as char(32), so the primary key and every secondary index entry carry 32 bytes instead of
+    16. Other databases and the API keep the regular UUID format.
+    """
+
+    @staticmethod
+    def is_binary(connection):
+        """
+        Whether the values are stored as binary(16) on the connection
+        :param connection:
+        :return:
+        """
+        return connection.vendor == 'mysql' and bool(settings.USER_ID_BINARY)
+
+    def get_internal_type(self):
+        # Own internal type, so the backend UUID converters do not run on the binary values
+        return 'CompactUUIDField'
+
+    def db_type(self, connection):
+        if self.is_binary(connection):
+            return 'binary(16)'
+        return connection.data_types['UUIDField']
+
+    def rel_db_type(self, connection):
+        return self.db_type(connection)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None or not self.is_binary(connection):
+            return super(CompactUUIDField, self).get_db_prep_value(value, connection, prepared)
+
+        if not isinstance(value, uuid.UUID):
+            value = self.to_python(value)
+        return value.bytes
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, bytes):
+            return uuid.UUID(bytes=value)
+        return uuid.UUID(value)
+
+
+def check_storage(sender, connection, **kwargs):
+    """
+    Fail fast when USER_ID_BINARY does not match the stored user id column on MySQL
+    The storage format is chosen when the users migrations run. Flipping the setting afterwards would send binary
+    values to a char(32) column or the reverse and break every query. Checked once per process and database, on the
+    first connection, so the requests do not pay for it.
+    :param sender:
+    :param connection:
+    :param kwargs:
+    :return:
+    """
+    if connection.vendor != 'mysql' or connection.alias in _checked:
+        return
+    # Before the conversion the column is char(32) whatever the setting
+    if STORAGE_MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT DATA_TYPE FROM information_schema.columns WHERE table_schema = DATABASE() "
+                       "AND table_name = 'users_user' AND column_name = 'id'")
+        row = cursor.fetchone()
+
+    expected = 'binary' if settings.USER_ID_BINARY else 'char'
+    if row and row[0].lower() != expected:
+        raise ImproperlyConfigured(
+            'USER_ID_BINARY=%d does not match the %s users_user.id column. Change the setting back, or migrate users '
+            'to 0003 with the old setting and migrate again with the new one.' % (settings.USER_ID_BINARY, row[0]))
+    _checked.add(connection.alias)
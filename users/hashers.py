@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher with the iteration count of PASSWORD_HASHER_ITERATIONS
+    It keeps the pbkdf2_sha256 algorithm name, so the stored hashes stay valid. Hashes with another iteration count
+    are reported as outdated and rehashed on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASHER_ITERATIONS
@@ -0,0 +1,260 @@
+import csv
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from service import constants
+from . import changelog
+from .models import User, UserChange, UserImportError, UserImportJob
+from .search import index_users
+from .serializers import UserImportRowSerializer
+
+
+def read_csv(file):
+    """
+    Rows of a CSV file with a header line, empty values are left out
+    :param file: Binary file
+    :return: Row number, data and parse errors of each row
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    for data in reader:
+        yield reader.line_num, {key: value for key, value in data.items() if key and value not in (None, '')}, None
+
+
+def read_ndjson(file):
+    """
+    Rows of a newline delimited JSON file, one object per line
+    :param file: Binary file
+    :return: Row number, data and parse errors of each row
+    """
+    for number, line in enumerate(io.TextIOWrapper(file, encoding='utf-8-sig'), 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield number, None, {'non_field_errors': [_('Invalid JSON.')]}
+            continue
+        if isinstance(data, dict):
+            yield number, data, None
+        else:
+            yield number, None, {'non_field_errors': [_('Expected a JSON object.')]}
+
+
+READERS = {
+    UserImportJob.Format.CSV: read_csv,
+    UserImportJob.Format.NDJSON: read_ndjson,
+}
+
+
+def chunks(rows, size):
+    """
+    Lists of up to size rows
+    :param rows:
+    :param size:
+    :return:
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_password_hash(password):
+    """
+    Whether a password is a hash of one of the PASSWORD_HASHERS
+    :param password:
+    :return:
+    """
+    try:
+        identify_hasher(password)
+    except ValueError:
+        return False
+    return True
+
+
+def import_chunk(rows, executor, hashed_passwords=False):
+    """
+    Validate a chunk of rows with the import row serializer, hash the passwords on the executor and insert the valid
+    users
+    :param rows: Row number, data and parse errors of each row
+    :param executor: Executor hashing the passwords
+    :param hashed_passwords: The passwords are hashes, e.g. of a legacy system, and are stored as they are
+    :return: Number of created users and the row number and errors of each rejected row
+    """
+    duplicate = {'username': [_('A user with that username already exists.')]}
+    not_hashed = {'password': [_('Expected a password hash.')]}
+    # Building the serializer fields costs more than validating a row, the fields are shared by the rows of the chunk
+    serializer = UserImportRowSerializer()
+    errors = []
+    rows_data = []
+    for number, data, error in rows:
+        if error is None:
+            try:
+                data = serializer.run_validation(data)
+            except ValidationError as exc:
+                error = as_serializer_error(exc)
+            else:
+                if not hashed_passwords or is_password_hash(data['password']):
+                    rows_data.append((number, data))
+                    continue
+                error = not_hashed
+        errors.append((number, error))
+
+    # One query checks the usernames of the chunk, soft deleted users keep their username
+    taken = User.all_objects.filter(username__in=[data['username'] for number, data in rows_data])
+    usernames = set(taken.values_list('username', flat=True))
+    valid = []
+    for number, data in rows_data:
+        if data['username'] in usernames:
+            errors.append((number, duplicate))
+        else:
+            usernames.add(data['username'])
+            valid.append((number, data))
+    errors.sort(key=lambda error: error[0])
+
+    passwords = [data['password'] for number, data in valid]
+    if not hashed_passwords:
+        passwords = executor.map(make_password, passwords)
+    users = [User(**dict(data, password=password)) for (number, data), password in zip(valid, passwords)]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            index_users(users)
+            changelog.record(UserChange.Action.CREATED, users)
+        return len(users), errors
+    except IntegrityError:
+        pass
+
+    # A username was taken by another request meanwhile, insert the users one by one
+    created = 0
+    for (number, data), user in zip(valid, users):
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user])
+                index_users([user])
+                changelog.record(UserChange.Action.CREATED, [user])
+            created += 1
+        except IntegrityError:
+            errors.append((number, duplicate))
+    return created, sorted(errors, key=lambda error: error[0])
+
+
+def run_import(job_id):
+    """
+    Process a pending import job
+    The file is read as a stream and imported in chunks of USER_IMPORT_CHUNK_SIZE rows, the progress is saved after
+    every chunk and up to USER_IMPORT_MAX_ERRORS row errors are kept, so the memory use does not grow with the file.
+    :param job_id:
+    :return: False when the job is not pending, e.g. it was claimed by another worker
+    """
+    now = timezone.now()
+    claimed = UserImportJob.objects.filter(pk=job_id, status=UserImportJob.Status.PENDING).update(
+        status=UserImportJob.Status.RUNNING, started=now, heartbeat=now)
+    if not claimed:
+        return False
+
+    job = UserImportJob.objects.get(pk=job_id)
+    logging.info('type=%s msg=%s data=%s' % (constants.USER_IMPORT_JOB_START, 'User import started', {'id': job_id}))
+
+    stored_errors = 0
+    try:
+        with job.file.open('rb'), ThreadPoolExecutor(settings.USER_IMPORT_HASH_WORKERS) as executor:
+            for rows in chunks(READERS[job.format](job.file.file), settings.USER_IMPORT_CHUNK_SIZE):
+                created, errors = import_chunk(rows, executor, job.hashed_passwords)
+
+                UserImportError.objects.bulk_create([
+                    UserImportError(job=job, row=number, errors=error)
+                    for number, error in errors[:max(settings.USER_IMPORT_MAX_ERRORS - stored_errors, 0)]
+                ])
+                stored_errors += len(errors)
+                running = UserImportJob.objects.filter(pk=job_id, status=UserImportJob.Status.RUNNING).update(
+                    processed_rows=F('processed_rows') + len(rows),
+                    created_rows=F('created_rows') + created,
+                    failed_rows=F('failed_rows') + len(errors),
+                    heartbeat=timezone.now(),
+                )
+                if not running:
+                    # The job was failed as stale meanwhile
+                    return True
+    except Exception as error:
+        logging.exception('type=%s msg=%s data=%s' % (constants.USER_IMPORT_JOB_ERROR, 'User import failed',
+                                                      {'id': job_id}))
+        UserImportJob.objects.filter(pk=job_id).update(
+            status=UserImportJob.Status.FAILED, message=str(error), finished=timezone.now())
+        return True
+
+    # The users are imported, the file is not needed anymore
+    job.file.delete(save=False)
+    UserImportJob.objects.filter(pk=job_id, status=UserImportJob.Status.RUNNING).update(
+        status=UserImportJob.Status.COMPLETED, file='', finished=timezone.now())
+    logging.info('type=%s msg=%s data=%s' % (constants.USER_IMPORT_JOB_FINISH, 'User import completed', {'id': job_id}))
+    return True
+
+
+def fail_stale_imports():
+    """
+    Fail the running jobs without progress for USER_IMPORT_STALE_AFTER seconds
+    Their worker stopped, e.g. the process was restarted mid-import, and no worker picks a running job up again. The
+    job is not resumed, its file would be imported from the start and the users created so far would be reported as
+    duplicates.
+    :return: Number of failed jobs
+    """
+    now = timezone.now()
+    failed = UserImportJob.objects.filter(
+        status=UserImportJob.Status.RUNNING, heartbeat__lt=now - timedelta(seconds=settings.USER_IMPORT_STALE_AFTER)
+    ).update(status=UserImportJob.Status.FAILED, message=_('The import was interrupted.'), finished=now)
+    if failed:
+        logging.warning('type=%s msg=%s data=%s' % (constants.USER_IMPORT_JOB_STALE, 'Stale user imports failed',
+                                                    {'count': failed}))
+    return failed
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def run_import_in_thread(job_id):
+    """
+    Process an import job in a worker thread and close the database connections of the thread afterwards
+    :param job_id:
+    :return:
+    """
+    try:
+        run_import(job_id)
+    finally:
+        connections.close_all()
+
+
+def enqueue(job):
+    """
+    Process an import job in a background thread once the current transaction is committed
+    With USER_IMPORT_WORKERS set to 0 the jobs are left to the process_user_imports command.
+    :param job:
+    :return:
+    """
+    global _executor
+
+    if not settings.USER_IMPORT_WORKERS:
+        return
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.USER_IMPORT_WORKERS, thread_name_prefix='user-import')
+    transaction.on_commit(lambda: _executor.submit(run_import_in_thread, job.pk))
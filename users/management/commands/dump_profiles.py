@@ -0,0 +1,50 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service import profiling
+
+EXTENSIONS = {'pstats': 'prof', 'collapsed': 'collapsed'}
+
+
+class Command(BaseCommand):
+    help = 'List the stored request profiles, slowest first, and write them to files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', help='Profiles to write, all of them by default')
+        parser.add_argument('--format', choices=sorted(EXTENSIONS), default='pstats',
+                            help='pstats for pstats, snakeviz or flameprof, collapsed for flamegraph.pl or speedscope')
+        parser.add_argument('--output', default='profiles', help='Directory the profiles are written to')
+        parser.add_argument('--list', action='store_true', help='Only list the profiles')
+
+    def handle(self, *args, **options):
+        if profiling.is_process_local():
+            raise CommandError('The profiles are kept in the %s cache of the server processes, which this command can '
+                               'not read. Set PROFILING_CACHE_BACKEND to a cache shared with them.'
+                               % type(profiling.profile_cache()).__name__)
+
+        index = profiling.profiles()
+        if options['ids']:
+            unknown = set(options['ids']) - {profile['id'] for profile in index}
+            if unknown:
+                raise CommandError('Unknown profiles: %s' % ', '.join(sorted(unknown)))
+            index = [profile for profile in index if profile['id'] in options['ids']]
+
+        if not options['list']:
+            os.makedirs(options['output'], exist_ok=True)
+
+        for profile in index:
+            line = '%(id)s %(duration)10.3fs %(status)s %(method)s %(path)s' % profile
+            if not options['list']:
+                stats = profiling.get_stats(profile['id'])
+                if stats is None:
+                    continue
+                path = os.path.join(options['output'], '%s.%s' % (profile['id'], EXTENSIONS[options['format']]))
+                if options['format'] == 'collapsed':
+                    with open(path, 'w') as profile_file:
+                        profile_file.write(profiling.dump_collapsed(stats))
+                else:
+                    with open(path, 'wb') as profile_file:
+                        profile_file.write(profiling.dump_pstats(stats))
+                line = '%s -> %s' % (line, path)
+            self.stdout.write(line)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema served by /swagger.json and /swagger.yaml'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.OPENAPI_SCHEMA_FILE, help='Schema file to write')
+        parser.add_argument('--check', action='store_true',
+                            help='Only check that the schema file matches the generated schema')
+
+    def handle(self, *args, **options):
+        from service.schema import generate_schema, write_schema
+
+        if options['check']:
+            try:
+                with open(options['output'], 'rb') as schema_file:
+                    current = schema_file.read()
+            except FileNotFoundError:
+                current = None
+            if current != generate_schema():
+                raise CommandError('%s is out of date, run generate_openapi_schema' % options['output'])
+            self.stdout.write('%s is up to date' % options['output'])
+            return
+
+        write_schema(options['output'])
+        self.stdout.write('Wrote %s' % options['output'])
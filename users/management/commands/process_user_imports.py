@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from users.imports import fail_stale_imports, run_import
+from users.models import UserImportJob
+
+
+class Command(BaseCommand):
+    help = 'Fail the stale running user imports and process the pending ones, oldest first'
+
+    def handle(self, *args, **options):
+        fail_stale_imports()
+        processed = 0
+        while True:
+            job_id = UserImportJob.objects.filter(status=UserImportJob.Status.PENDING).order_by(
+                'created').values_list('pk', flat=True).first()
+            if job_id is None:
+                break
+            if run_import(job_id):
+                processed += 1
+
+        self.stdout.write('Processed %d user imports' % processed)
@@ -0,0 +1,44 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from service import constants
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Remove the soft deleted users in small batches to keep the lock times short'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.USER_PURGE_AFTER_DAYS,
+                            help='Remove the users deleted more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=settings.USER_PURGE_BATCH_SIZE,
+                            help='Number of users removed per transaction')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between the batches')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        queryset = User.all_objects.filter(deleted_at__lt=cutoff).order_by('deleted_at')
+        purged = 0
+
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+
+            with transaction.atomic():
+                User.all_objects.filter(pk__in=pks).delete()
+
+            purged += len(pks)
+            logging.info('type=%s msg=%s data=%s' % (constants.USER_PURGE_BATCH, 'Soft deleted users purged',
+                                                     {'count': len(pks), 'total': purged}))
+            if len(pks) < options['batch_size']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write('Purged %d users deleted before %s' % (purged, cutoff.isoformat()))
@@ -0,0 +1,39 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from service import constants
+from users.models import UserChange
+
+
+class Command(BaseCommand):
+    help = 'Remove the old entries of the user change log in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.USER_CHANGES_RETENTION_DAYS,
+                            help='Remove the changes logged more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=settings.USER_PURGE_BATCH_SIZE,
+                            help='Number of changes removed per query')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # The ids grow with the time, so the old changes are at the start of the primary key
+        queryset = UserChange.objects.filter(created__lt=cutoff).order_by('pk')
+        purged = 0
+
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+
+            UserChange.objects.filter(pk__in=pks).delete()
+            purged += len(pks)
+            logging.info('type=%s msg=%s data=%s' % (constants.USER_CHANGES_PURGE_BATCH, 'User changes purged',
+                                                     {'count': len(pks), 'total': purged}))
+            if len(pks) < options['batch_size']:
+                break
+
+        self.stdout.write('Purged %d user changes logged before %s' % (purged, cutoff.isoformat()))
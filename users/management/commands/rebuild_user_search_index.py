@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.search import FIELDS, index_users
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search tokens of all the users in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of users indexed per batch')
+
+    def handle(self, *args, **options):
+        queryset = User.objects.order_by('pk').only('pk', *FIELDS)
+        last = None
+        indexed = 0
+
+        while True:
+            batch = list((queryset.filter(pk__gt=last) if last is not None else queryset)[:options['batch_size']])
+            if not batch:
+                break
+            index_users(batch)
+            indexed += len(batch)
+            last = batch[-1].pk
+
+        self.stdout.write('Indexed %d users' % indexed)
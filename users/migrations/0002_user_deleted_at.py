@@ -0,0 +1,32 @@
+# Generated by Django 3.1 on 2026-10-19 13:14
+
+from django.db import migrations, models
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ('-created',), 'verbose_name': 'user', 'verbose_name_plural': 'users'},
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='deleted at'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, upload_to=users.models.User.user_directory_path, verbose_name='avatar'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['deleted_at', 'created'], name='users_user_live_created_idx'),
+        ),
+    ]
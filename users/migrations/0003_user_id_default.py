@@ -0,0 +1,19 @@
+# Generated by Django 3.1 on 2026-10-19 13:15
+
+from django.db import migrations, models
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=users.models.generate_id, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 3.1 on 2026-10-19 13:17
+
+from django.conf import settings
+from django.db import migrations
+
+import users.fields
+import users.models
+
+
+def copy_ids(schema_editor, table, column, expression, batch_size):
+    """
+    Copy the converted ids into the new column in primary key ranges, each batch commits on its own
+    The batches keep the transactions and their undo logs small, the table is still rebuilt by the primary key swap.
+    """
+    table = schema_editor.quote_name(table)
+    column = schema_editor.quote_name(column)
+    lower = None
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            condition, params = ('WHERE id > %s', [lower]) if lower is not None else ('', [])
+            cursor.execute('SELECT MAX(id) FROM (SELECT id FROM %s %s ORDER BY id LIMIT %d) AS batch' % (
+                table, condition, batch_size), params)
+            upper = cursor.fetchone()[0]
+            if upper is None:
+                break
+
+            condition, params = ('AND id > %s', [lower]) if lower is not None else ('', [])
+            cursor.execute('UPDATE %s SET %s = %s WHERE id <= %%s %s' % (table, column, expression, condition),
+                           [upper] + params)
+            lower = upper
+
+
+def swap_id_column(schema_editor, table, column, column_type):
+    """
+    Replace the primary key column with the converted one
+    MySQL rebuilds the whole table for the new primary key, plan the migration for a quiet period on large tables.
+    """
+    quote = schema_editor.quote_name
+    schema_editor.execute('ALTER TABLE %s DROP PRIMARY KEY, DROP COLUMN id, CHANGE %s id %s NOT NULL FIRST, '
+                          'ADD PRIMARY KEY (id)' % (quote(table), quote(column), column_type))
+
+
+def convert(schema_editor, column, column_type, expression):
+    if schema_editor.connection.vendor != 'mysql' or not settings.USER_ID_BINARY:
+        return
+
+    table = 'users_user'
+    schema_editor.execute('ALTER TABLE %s ADD COLUMN %s %s NULL' % (
+        schema_editor.quote_name(table), schema_editor.quote_name(column), column_type))
+    copy_ids(schema_editor, table, column, expression, settings.USER_ID_BINARY_BATCH_SIZE)
+    swap_id_column(schema_editor, table, column, column_type)
+
+
+def char_to_binary(apps, schema_editor):
+    convert(schema_editor, 'id_binary', 'binary(16)', 'UNHEX(id)')
+
+
+def binary_to_char(apps, schema_editor):
+    convert(schema_editor, 'id_char', 'char(32)', 'LOWER(HEX(id))')
+
+
+class Migration(migrations.Migration):
+
+    # The id conversion commits batch by batch
+    atomic = False
+
+    dependencies = [
+        ('users', '0003_user_id_default'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(char_to_binary, binary_to_char),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='user',
+                    name='id',
+                    field=users.fields.CompactUUIDField(default=users.models.generate_id, editable=False,
+                                                        primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1 on 2026-10-19 13:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_id_binary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, 'First Name'), (2, 'Last Name'), (3, 'Email Address'), (4, 'Mobile Number')], verbose_name='field')),
+                ('token', models.CharField(max_length=3, verbose_name='token')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='users.user')),
+            ],
+            options={
+                'verbose_name': 'user search token',
+                'verbose_name_plural': 'user search tokens',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='usersearchtoken',
+            index=models.Index(fields=['token', 'user', 'field'], name='users_search_token_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 3.1 on 2026-10-19 13:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import users.models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserImportError',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('row', models.PositiveIntegerField(verbose_name='row')),
+                ('errors', models.JSONField(verbose_name='errors')),
+            ],
+            options={
+                'verbose_name': 'user import error',
+                'verbose_name_plural': 'user import errors',
+                'ordering': ('row',),
+            },
+        ),
+        migrations.CreateModel(
+            name='UserImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file', models.FileField(blank=True, upload_to=users.models.import_file_path, verbose_name='file')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')], max_length=6, verbose_name='format')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=9, verbose_name='status')),
+                ('processed_rows', models.PositiveIntegerField(default=0, verbose_name='processed rows')),
+                ('created_rows', models.PositiveIntegerField(default=0, verbose_name='created rows')),
+                ('failed_rows', models.PositiveIntegerField(default=0, verbose_name='failed rows')),
+                ('message', models.TextField(blank=True, verbose_name='message')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='started')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='finished')),
+            ],
+            options={
+                'verbose_name': 'user import job',
+                'verbose_name_plural': 'user import jobs',
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='userimportjob',
+            index=models.Index(fields=['status', 'created'], name='users_import_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='userimporterror',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='errors', to='users.userimportjob'),
+        ),
+        migrations.AddIndex(
+            model_name='userimporterror',
+            index=models.Index(fields=['job', 'row'], name='users_import_error_row_idx'),
+        ),
+    ]
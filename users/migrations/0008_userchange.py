@@ -0,0 +1,29 @@
+# Generated by Django 3.1 on 2026-10-19 13:48
+
+from django.db import migrations, models
+import users.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_userimportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('user_id', users.fields.CompactUUIDField(verbose_name='user id')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=7, verbose_name='action')),
+                ('data', models.JSONField(blank=True, null=True, verbose_name='data')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+            ],
+            options={
+                'verbose_name': 'user change',
+                'verbose_name_plural': 'user changes',
+                'ordering': ('id',),
+            },
+        ),
+    ]
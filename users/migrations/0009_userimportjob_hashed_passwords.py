@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_userchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userimportjob',
+            name='hashed_passwords',
+            field=models.BooleanField(default=False, help_text='The passwords of the file are hashes and are stored as they are, e.g. from a legacy system.', verbose_name='hashed passwords'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-19 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_userimportjob_hashed_passwords'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userimportjob',
+            name='heartbeat',
+            field=models.DateTimeField(blank=True, help_text='Last progress of a running job, a job without progress for a while lost its worker.', null=True, verbose_name='heartbeat'),
+        ),
+    ]
@@ -1,18 +1,43 @@
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from service.utils import uuid7
+from .fields import CompactUUIDField
+
+
+def generate_id():
+    """
+    Primary key of a new user
+    A time ordered UUID when USER_ID_VERSION is 7, otherwise a random one
+    :return:
+    """
+    if settings.USER_ID_VERSION == 7:
+        return uuid7()
+    return uuid.uuid4()
+
+
+class UserManager(models.Manager):
+    """
+    Manager of the users which are not soft deleted
+    """
+
+    def get_queryset(self):
+        return super(UserManager, self).get_queryset().filter(deleted_at__isnull=True)
+
 
 class User(models.Model):
     """
     User Model
     """
 
-    objects = models.Manager()
+    objects = UserManager()
+    all_objects = models.Manager()
     username_validator = UnicodeUsernameValidator()
 
     def user_directory_path(self, filename):
@@ -32,7 +57,7 @@ class User(models.Model):
 
         __empty__ = _('(Unknown)')
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = CompactUUIDField(primary_key=True, default=generate_id, editable=False)
     username = models.CharField(
         _('username'),
         max_length=150,
@@ -64,21 +89,221 @@ class User(models.Model):
     )
     created = models.DateTimeField(_('created'), auto_now_add=True)
     updated = models.DateTimeField(_('updated'), default=timezone.now)
+    deleted_at = models.DateTimeField(_('deleted at'), blank=True, null=True, editable=False)
+
+    # Field values as loaded from or last saved to the database, None for a new user
+    _loaded_values = None
+    # Hash made by set_password, any other new password value is a raw password
+    _password_hash = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Build a user from a database row and remember the loaded values
+        :param db:
+        :param field_names:
+        :param values:
+        :return:
+        """
+        user = super(User, cls).from_db(db, field_names, values)
+        user._loaded_values = dict(zip(field_names, values))
+        return user
+
+    def changed_fields(self, names):
+        """
+        Which of the fields differ from the loaded values, fields which were not loaded are left out
+        :param names: Field attribute names
+        :return: All the names for a new user
+        """
+        if self._loaded_values is None:
+            return set(names)
+        return {name for name in names
+                if name in self.__dict__ and self.__dict__[name] != self._loaded_values.get(name, models.DEFERRED)}
+
+    def set_password(self, raw_password):
+        """
+        Hash a plain-text password for database storage, the instance is not saved
+        A value which looks like a hash is hashed too, so a client can not store a hash of its own.
+        :param raw_password:
+        :return:
+        """
+        self.password = self._password_hash = make_password(raw_password)
 
     def save(self, *args, **kwargs):
         """
         Save a user instance
-        Turn a plain-text password into a hash for database storage
+        A password assigned since the user was loaded, e.g. by User.objects.create(password=...), is a raw password
+        and is hashed, whatever it looks like. A hash is only stored as it is with bulk_create or update.
         :param args:
         :param kwargs:
         :return:
         """
-        self.password = make_password(self.password)
+        update_fields = kwargs.get('update_fields')
+        if ((update_fields is None or 'password' in update_fields) and self.changed_fields(['password']) and
+                self.password != self._password_hash):
+            self.set_password(self.password)
         self.updated = timezone.now()
         super(User, self).save(*args, **kwargs)
 
+        saved = {field.attname for field in self._meta.concrete_fields
+                 if update_fields is None or field.name in update_fields or field.attname in update_fields}
+        self._loaded_values = dict(self._loaded_values or {}, **{
+            name: value for name, value in self.__dict__.items() if name in saved
+        })
+
+    def soft_delete(self):
+        """
+        Mark the user as deleted and inactive
+        Updates the row directly, so only the deletion columns are written
+        :return:
+        """
+        now = timezone.now()
+        User.all_objects.filter(pk=self.pk).update(deleted_at=now, is_active=False, updated=now)
+
+        self.deleted_at = self.updated = now
+        self.is_active = False
+
     class Meta:
-        app_label = _('users')
+        app_label = 'users'
         verbose_name = _('user')
         verbose_name_plural = _('users')
         ordering = ('-created',)
+        indexes = [
+            # Serves the not deleted filter of the default manager together with the default ordering.
+            # MySQL has no partial indexes, so deleted_at leads a composite index instead.
+            models.Index(fields=['deleted_at', 'created'], name='users_user_live_created_idx'),
+            # Admin change list ordering and its active filter
+            models.Index(fields=['created'], name='users_user_created_idx'),
+            models.Index(fields=['is_active', 'created'], name='users_user_active_created_idx'),
+        ]
+
+
+class UserSearchToken(models.Model):
+    """
+    User Search Token Model
+    Normalized trigram of a searchable user field, kept in sync with the users by the users signals
+    """
+
+    class Field(models.IntegerChoices):
+        FIRST_NAME = 1, _('First Name')
+        LAST_NAME = 2, _('Last Name')
+        EMAIL = 3, _('Email Address')
+        MOBILE_NUMBER = 4, _('Mobile Number')
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_tokens')
+    field = models.PositiveSmallIntegerField(_('field'), choices=Field.choices)
+    token = models.CharField(_('token'), max_length=3)
+
+    class Meta:
+        app_label = 'users'
+        verbose_name = _('user search token')
+        verbose_name_plural = _('user search tokens')
+        indexes = [
+            # Covers the token lookup and the grouping by user and field
+            models.Index(fields=['token', 'user', 'field'], name='users_search_token_idx'),
+        ]
+
+
+def import_file_path(instance, filename):
+    """
+    Format the import file path
+    :param instance:
+    :param filename:
+    :return:
+    """
+    # file will be uploaded to MEDIA_ROOT/imports/<id>/<filename>
+    return 'imports/{0}/{1}'.format(instance.id, filename)
+
+
+class UserImportJob(models.Model):
+    """
+    User Import Job Model
+    Progress of an uploaded CSV or NDJSON file of users, processed by users.imports
+    """
+
+    class Format(models.TextChoices):
+        CSV = 'csv', _('CSV')
+        NDJSON = 'ndjson', _('NDJSON')
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(_('file'), upload_to=import_file_path, blank=True)
+    format = models.CharField(_('format'), max_length=6, choices=Format.choices)
+    status = models.CharField(_('status'), max_length=9, choices=Status.choices, default=Status.PENDING)
+    processed_rows = models.PositiveIntegerField(_('processed rows'), default=0)
+    created_rows = models.PositiveIntegerField(_('created rows'), default=0)
+    failed_rows = models.PositiveIntegerField(_('failed rows'), default=0)
+    hashed_passwords = models.BooleanField(
+        _('hashed passwords'), default=False,
+        help_text=_('The passwords of the file are hashes and are stored as they are, e.g. from a legacy system.'),
+    )
+    message = models.TextField(_('message'), blank=True)
+    created = models.DateTimeField(_('created'), auto_now_add=True)
+    started = models.DateTimeField(_('started'), blank=True, null=True)
+    heartbeat = models.DateTimeField(
+        _('heartbeat'), blank=True, null=True,
+        help_text=_('Last progress of a running job, a job without progress for a while lost its worker.'),
+    )
+    finished = models.DateTimeField(_('finished'), blank=True, null=True)
+
+    class Meta:
+        app_label = 'users'
+        verbose_name = _('user import job')
+        verbose_name_plural = _('user import jobs')
+        ordering = ('-created',)
+        indexes = [
+            # The pending jobs are picked up oldest first
+            models.Index(fields=['status', 'created'], name='users_import_status_idx'),
+        ]
+
+
+class UserImportError(models.Model):
+    """
+    User Import Error Model
+    Validation errors of a rejected row of an import file
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    job = models.ForeignKey(UserImportJob, on_delete=models.CASCADE, related_name='errors')
+    row = models.PositiveIntegerField(_('row'))
+    errors = models.JSONField(_('errors'))
+
+    class Meta:
+        app_label = 'users'
+        verbose_name = _('user import error')
+        verbose_name_plural = _('user import errors')
+        ordering = ('row',)
+        indexes = [
+            models.Index(fields=['job', 'row'], name='users_import_error_row_idx'),
+        ]
+
+
+class UserChange(models.Model):
+    """
+    User Change Model
+    Append only log of the user mutations, written in the transaction of the mutation and read by downstream consumers
+    through the changes API. The id is the cursor of the feed.
+    """
+
+    class Action(models.TextChoices):
+        CREATED = 'created', _('Created')
+        UPDATED = 'updated', _('Updated')
+        DELETED = 'deleted', _('Deleted')
+
+    id = models.BigAutoField(primary_key=True)
+    user_id = CompactUUIDField(_('user id'))
+    action = models.CharField(_('action'), max_length=7, choices=Action.choices)
+    data = models.JSONField(_('data'), blank=True, null=True)
+    created = models.DateTimeField(_('created'), auto_now_add=True)
+
+    class Meta:
+        app_label = 'users'
+        verbose_name = _('user change')
+        verbose_name_plural = _('user changes')
+        ordering = ('id',)
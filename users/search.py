@@ -0,0 +1,153 @@
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Q, When
+
+from .models import User, UserSearchToken
+
+# Searchable fields with their token field and rank weight
+FIELDS = {
+    'first_name': (UserSearchToken.Field.FIRST_NAME, 3),
+    'last_name': (UserSearchToken.Field.LAST_NAME, 3),
+    'email': (UserSearchToken.Field.EMAIL, 2),
+    'mobile_number': (UserSearchToken.Field.MOBILE_NUMBER, 1),
+}
+
+MIN_QUERY_LENGTH = 3
+
+# Trigrams of a long query whose postings are counted, a few trigrams spread over the query narrow it down enough
+MAX_QUERY_TRIGRAMS = 8
+
+
+def normalize(value):
+    """
+    Lower case letters and digits of a value without accents
+    :param value:
+    :return:
+    """
+    value = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in value.casefold() if char.isalnum())
+
+
+def trigrams(value):
+    """
+    Trigrams of a normalized value
+    :param value:
+    :return:
+    """
+    return {value[index:index + 3] for index in range(len(value) - 2)}
+
+
+def query_trigrams(query):
+    """
+    Up to MAX_QUERY_TRIGRAMS trigrams of a normalized query, evenly spread over it
+    The candidates are checked against the whole query afterwards, so leaving trigrams out only widens the candidates.
+    :param query:
+    :return:
+    """
+    count = len(query) - 2
+    step = max(count / MAX_QUERY_TRIGRAMS, 1)
+    return {query[int(index * step):int(index * step) + 3] for index in range(min(count, MAX_QUERY_TRIGRAMS))}
+
+
+def index_users(users):
+    """
+    Replace the search tokens of the users
+    :param users:
+    :return:
+    """
+    users = list(users)
+    UserSearchToken.objects.filter(user__in=[user.pk for user in users]).delete()
+    UserSearchToken.objects.bulk_create([
+        UserSearchToken(user_id=user.pk, field=field, token=token)
+        for user in users
+        for name, (field, _) in FIELDS.items()
+        for token in trigrams(normalize(getattr(user, name)))
+    ], batch_size=1000)
+
+
+def score(user, query):
+    """
+    Rank of a user for a normalized query, 0 when no field contains the query
+    A field counts with its weight, twice when it starts with the query and three times when it equals it.
+    :param user:
+    :param query:
+    :return:
+    """
+    total = 0
+    for name, (_, weight) in FIELDS.items():
+        value = normalize(getattr(user, name))
+        if value == query:
+            total += weight * 3
+        elif value.startswith(query):
+            total += weight * 2
+        elif query in value:
+            total += weight
+    return total
+
+
+def posting_count(token, cap):
+    """
+    Number of search tokens with the value, counted up to cap
+    :param token:
+    :param cap:
+    :return:
+    """
+    return UserSearchToken.objects.filter(token=token)[:cap].count()
+
+
+def match_order(text, prefix=''):
+    """
+    Ordering of the candidates before they are cut off at USER_SEARCH_MAX_CANDIDATES, users with a field equal to the
+    text first, then the users with a field starting with it
+    :param text:
+    :param prefix: Path from the queried model to the user, e.g. user__
+    :return:
+    """
+    exact, starts = Q(), Q()
+    for name in FIELDS:
+        exact |= Q(**{'%s%s__iexact' % (prefix, name): text})
+        starts |= Q(**{'%s%s__istartswith' % (prefix, name): text})
+    return Case(When(exact, then=0), When(starts, then=1), default=2, output_field=IntegerField())
+
+
+def search(text, limit):
+    """
+    Users matching a fragment of their first name, last name, email or mobile number, best ranked first
+    The rarest query trigrams narrow the users down to the ones having them all in one field, the candidates are then
+    checked and ranked in Python. When even the rarest trigram is common, a plain contains scan finds enough candidates
+    faster than the index. Up to USER_SEARCH_MAX_CANDIDATES candidates are ranked, exact and prefix matches are taken
+    first, so with more candidates only contained matches are left out.
+    :param text: Fragment with at least MIN_QUERY_LENGTH letters or digits
+    :param limit:
+    :return: Users with a `score` attribute
+    """
+    query = normalize(text)
+    text = text.strip()
+    common = settings.USER_SEARCH_COMMON_TOKEN_COUNT
+    counts = {gram: posting_count(gram, common) for gram in query_trigrams(query)}
+    rarest = sorted(counts, key=counts.get)[:3]
+
+    if counts[rarest[0]] >= common:
+        users = User.objects.filter(
+            Q(first_name__icontains=text) | Q(last_name__icontains=text) | Q(email__icontains=text) |
+            Q(mobile_number__icontains=text)
+        ).order_by(match_order(text))[:settings.USER_SEARCH_MAX_CANDIDATES]
+    else:
+        candidates = UserSearchToken.objects.filter(token__in=rarest).values('user_id', 'field').annotate(
+            hits=Count('token')
+        ).filter(hits=len(rarest)).order_by(match_order(text, 'user__')).values_list(
+            'user_id', flat=True)[:settings.USER_SEARCH_MAX_CANDIDATES]
+        users = User.objects.filter(pk__in=set(candidates))
+
+    ranked = defaultdict(list)
+    for user in users:
+        user.score = score(user, query)
+        if user.score:
+            ranked[user.score].append(user)
+
+    results = []
+    for rank in sorted(ranked, reverse=True):
+        results.extend(sorted(ranked[rank], key=lambda user: user.username))
+    return results[:limit]
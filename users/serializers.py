@@ -1,7 +1,23 @@
+import os
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 from service.settings import UPLOADED_FILES_USE_URL
-from .models import User
+from .models import User, UserChange, UserImportError, UserImportJob
+
+
+class SettingListField(serializers.ListField):
+    """
+    List limited to the number of items given by a setting
+    The serializers copy their declared fields on every instantiation, which runs __init__ again, so the limit follows
+    the active settings.
+    """
+
+    def __init__(self, max_length_setting, **kwargs):
+        super().__init__(max_length=getattr(settings, max_length_setting), **kwargs)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,5 +32,125 @@ class UserSerializer(serializers.ModelSerializer):
         )
         extra_kwargs = {
             'password': {'write_only': True, 'style': {'input_type': 'password'}},
-            'updated': {'read_only': True}
+            'updated': {'read_only': True},
+            # Soft deleted users keep their username, check it against all the users
+            'username': {'validators': [
+                User.username_validator,
+                UniqueValidator(queryset=User.all_objects.all(), message=_('A user with that username already exists.'))
+            ]}
         }
+
+
+class UserImportRowSerializer(UserSerializer):
+    """
+    User serializer of the rows of an import file, the usernames are checked for uniqueness per chunk of rows
+    """
+
+    class Meta(UserSerializer.Meta):
+        extra_kwargs = dict(UserSerializer.Meta.extra_kwargs, username={'validators': [User.username_validator]})
+
+
+class LoginSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=150)
+    password = serializers.CharField(max_length=128, style={'input_type': 'password'}, trim_whitespace=False)
+
+
+class TokenSerializer(serializers.Serializer):
+    token = serializers.CharField()
+
+
+class UserSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=150)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+
+class UserBatchSerializer(serializers.Serializer):
+    ids = SettingListField('USER_BATCH_MAX_IDS', child=serializers.UUIDField(), allow_empty=False)
+
+
+class UserBulkFilterSerializer(serializers.Serializer):
+    ids = SettingListField('USER_BULK_UPDATE_MAX_ITEMS', child=serializers.UUIDField(), required=False,
+                           allow_empty=False)
+    usernames = SettingListField('USER_BULK_UPDATE_MAX_ITEMS', child=serializers.CharField(max_length=150),
+                                 required=False, allow_empty=False)
+    is_active = serializers.BooleanField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(_('Provide at least one filter.'))
+        return attrs
+
+
+class UserBulkValuesSerializer(serializers.Serializer):
+    is_active = serializers.BooleanField(required=False)
+    first_name = serializers.CharField(max_length=30, required=False, allow_blank=True)
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    gender = serializers.ChoiceField(choices=User.Gender.choices, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(_('Provide at least one value.'))
+        return attrs
+
+
+class UserBulkUpdateSerializer(serializers.Serializer):
+    filter = UserBulkFilterSerializer()
+    values = UserBulkValuesSerializer()
+    dry_run = serializers.BooleanField(default=False)
+
+
+class UserChangesSerializer(serializers.Serializer):
+    # Change ids are 64 bit, larger cursors overflow the database integer
+    since = serializers.IntegerField(min_value=0, max_value=2 ** 63 - 1, default=0)
+    limit = serializers.IntegerField(min_value=1, required=False)
+    wait = serializers.IntegerField(min_value=0, default=0)
+    compact = serializers.BooleanField(default=False)
+
+
+class UserChangeSerializer(serializers.ModelSerializer):
+    cursor = serializers.IntegerField(source='id')
+    user = serializers.JSONField(source='data')
+
+    class Meta:
+        model = UserChange
+        fields = ('cursor', 'user_id', 'action', 'created', 'user')
+
+
+class UserImportErrorSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = UserImportError
+        fields = ('row', 'errors')
+
+
+class UserImportJobSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(choices=UserImportJob.Format.choices, required=False)
+    row_errors = UserImportErrorSerializer(source='errors', many=True, read_only=True)
+
+    # File extensions of the formats, used when no format is given
+    extensions = {
+        '.csv': UserImportJob.Format.CSV,
+        '.ndjson': UserImportJob.Format.NDJSON,
+        '.jsonl': UserImportJob.Format.NDJSON,
+    }
+
+    class Meta:
+        model = UserImportJob
+        fields = (
+            'id', 'file', 'format', 'hashed_passwords', 'status', 'processed_rows', 'created_rows', 'failed_rows',
+            'message', 'created', 'started', 'finished', 'row_errors'
+        )
+        read_only_fields = (
+            'status', 'processed_rows', 'created_rows', 'failed_rows', 'message', 'started', 'finished'
+        )
+
+    def validate(self, attrs):
+        if 'format' not in attrs:
+            extension = os.path.splitext(attrs['file'].name)[1].lower()
+            if extension not in self.extensions:
+                raise serializers.ValidationError({'format': [_('Provide the format of the file.')]})
+            attrs['format'] = self.extensions[extension]
+        return attrs
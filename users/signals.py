@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User
+from .search import FIELDS, index_users
+
+
+@receiver(post_save, sender=User)
+def update_search_tokens(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Keep the search tokens of a saved user in sync, the tokens of a deleted user are deleted with it
+    The user is only reindexed when a searchable field was saved with a new value.
+    :param sender:
+    :param instance:
+    :param raw:
+    :param update_fields:
+    :param kwargs:
+    :return:
+    """
+    names = FIELDS.keys() if update_fields is None else FIELDS.keys() & set(update_fields)
+    if not raw and instance.changed_fields(names):
+        index_users([instance])
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..activity import ActivityTracker
+from ..models import User
+
+
+class ActivityTrackerTests(TestCase):
+
+    def setUp(self):
+        self.timer = mock.Mock(return_value=0)
+        patcher = mock.patch('users.activity.threading.Timer')
+        self.flush_timer = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tracker = ActivityTracker(flush_interval=30, rewrite_after=60, max_pending=3, timer=self.timer)
+        User.objects.bulk_create([User(username='test%d' % value, password='test@123') for value in range(3)])
+        self.users = list(User.objects.order_by('username'))
+
+    def test_touch_buffers_until_interval(self):
+        """
+        Ensure touches are only written once the flush interval has passed.
+        """
+        self.tracker.touch(self.users[0].pk)
+        self.assertIsNone(User.objects.get(pk=self.users[0].pk).last_login)
+
+        self.timer.return_value = 30
+        self.tracker.touch(self.users[1].pk)
+
+        self.assertEqual(User.objects.filter(last_login__isnull=False).count(), 2)
+
+    @mock.patch('users.activity.connections')
+    def test_timer_flushes_quiet_buffer(self, connections):
+        """
+        Ensure a buffered touch is written by the flush timer without a later touch.
+        """
+        self.tracker.touch(self.users[0].pk)
+        self.tracker.touch(self.users[1].pk)
+
+        self.flush_timer.assert_called_once()
+        interval, flush = self.flush_timer.call_args[0]
+        self.assertEqual(interval, 30)
+
+        flush()
+        self.assertEqual(User.objects.filter(last_login__isnull=False).count(), 2)
+        connections.close_all.assert_called_once()
+
+    def test_flush_cancels_timer(self):
+        """
+        Ensure a flush stops the running timer and the next touch starts a new one.
+        """
+        self.tracker.touch(self.users[0].pk)
+        self.tracker.flush()
+        self.flush_timer.return_value.cancel.assert_called_once()
+
+        self.tracker.touch(self.users[1].pk)
+        self.assertEqual(self.flush_timer.call_count, 2)
+
+    def test_flush_coalesces_touches(self):
+        """
+        Ensure several touches of the same user are written as the latest time with a single query.
+        """
+        now = timezone.now()
+        self.tracker.touch(self.users[0].pk, now - timedelta(seconds=10))
+        self.tracker.touch(self.users[0].pk, now)
+        self.tracker.touch(self.users[0].pk, now - timedelta(seconds=5))
+        self.tracker.touch(self.users[1].pk, now)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.tracker.flush(), 2)
+
+        user = User.objects.get(pk=self.users[0].pk)
+        self.assertEqual(user.last_login, now)
+        self.assertEqual(user.password, self.users[0].password)
+
+    def test_flush_skips_fresh_last_login(self):
+        """
+        Ensure users seen within rewrite after are not written again.
+        """
+        recent = timezone.now() - timedelta(seconds=10)
+        User.objects.filter(pk=self.users[0].pk).update(last_login=recent)
+
+        self.tracker.touch(self.users[0].pk)
+
+        self.assertEqual(self.tracker.flush(), 0)
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).last_login, recent)
+
+    def test_touch_flushes_when_full(self):
+        """
+        Ensure the buffer is flushed once it holds max pending users.
+        """
+        for user in self.users:
+            self.tracker.touch(user.pk)
+
+        self.assertFalse(User.objects.filter(last_login__isnull=True).exists())
@@ -0,0 +1,189 @@
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import cache as user_cache, changelog
+from ..models import User, UserChange
+
+
+@skipUnless(apps.is_installed('django.contrib.admin'), 'Admin is not installed')
+class UserAdminTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin@123')
+        self.client.force_login(admin)
+        self.url = reverse('admin:users_user_changelist')
+        self.live = User.objects.create(username='live', password='test@123')
+        self.deleted = User.objects.create(username='deleted', password='test@123')
+        self.deleted.soft_delete()
+
+    def test_changelist_lists_all_users(self):
+        """
+        Ensure the change list shows soft deleted users too and filters them by the deleted state.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.context['cl'].result_list), {self.live, self.deleted})
+
+        response = self.client.get(self.url, {'deleted': '1'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.deleted])
+
+        response = self.client.get(self.url, {'deleted': '0'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.live])
+
+    def test_changelist_loads_listed_columns_only(self):
+        """
+        Ensure columns which are not listed, like the password, are deferred.
+        """
+        response = self.client.get(self.url)
+        user = response.context['cl'].result_list[0]
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertNotIn('username', user.get_deferred_fields())
+
+    def test_search_by_id(self):
+        """
+        Ensure a user id in the search box is looked up by primary key.
+        """
+        response = self.client.get(self.url, {'q': str(self.deleted.pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [self.deleted])
+
+        response = self.client.get(self.url, {'q': 'liv'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.live])
+
+    @override_settings(USER_ADMIN_ESTIMATE_THRESHOLD=1000)
+    def test_estimated_count(self):
+        """
+        Ensure a large unfiltered table is counted from the table statistics and a filtered one exactly.
+        """
+        with mock.patch('users.admin.EstimatedCountPaginator.estimate', return_value=5000):
+            response = self.client.get(self.url)
+            self.assertEqual(response.context['cl'].result_count, 5000)
+            self.assertIsNone(response.context['cl'].full_result_count)
+
+            response = self.client.get(self.url, {'is_active__exact': '1'})
+            self.assertEqual(response.context['cl'].result_count, 1)
+
+        with mock.patch('users.admin.EstimatedCountPaginator.estimate', return_value=10):
+            response = self.client.get(self.url)
+            self.assertEqual(response.context['cl'].result_count, 2)
+
+    def test_deactivate_and_activate_actions(self):
+        """
+        Ensure the actions update the users without saving them and drop them from the cache.
+        """
+        user_cache.set_users([{'id': str(self.live.pk), 'username': self.live.username}])
+        with mock.patch.object(User, 'save') as save:
+            response = self.client.post(self.url, {
+                'action': 'deactivate_users',
+                ACTION_CHECKBOX_NAME: [str(self.live.pk)],
+            })
+            self.assertEqual(response.status_code, 302)
+            save.assert_not_called()
+
+        user = User.objects.get(pk=self.live.pk)
+        self.assertFalse(user.is_active)
+        self.assertEqual(user.password, self.live.password)
+        self.assertEqual(user_cache.get_users([self.live.pk]), {})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {'action': 'activate_users', ACTION_CHECKBOX_NAME: [str(self.live.pk)]})
+        self.assertTrue(User.objects.get(pk=self.live.pk).is_active)
+        # The selected users are found by their primary keys, not by scanning the table
+        self.assertFalse(any('"users_user"."updated" =' in query['sql'] for query in queries.captured_queries))
+
+    @override_settings(USER_BULK_UPDATE_BATCH_SIZE=2)
+    def test_action_on_all_users(self):
+        """
+        Ensure an action on all the users runs one UPDATE per batch of primary keys and logs every user.
+        """
+        User.objects.bulk_create([User(username='user%d' % index, password='test@123') for index in range(4)])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {
+                'action': 'deactivate_users',
+                'select_across': '1',
+                'index': '0',
+                ACTION_CHECKBOX_NAME: [str(self.live.pk)],
+            })
+
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "users_user"')]
+        self.assertEqual(len(updates), 3)
+        self.assertTrue(all('"users_user"."id" IN' in sql for sql in updates))
+        self.assertFalse(User.all_objects.filter(is_active=True).exists())
+        self.assertEqual(UserChange.objects.filter(action=UserChange.Action.UPDATED).count(),
+                         User.all_objects.count())
+
+    def test_soft_delete_action(self):
+        """
+        Ensure the delete action soft deletes the selected users and the bulk delete action is not offered.
+        """
+        response = self.client.get(self.url)
+        actions = [name for name, description in response.context['action_form'].fields['action'].choices]
+        self.assertIn('delete_users', actions)
+        self.assertNotIn('delete_selected', actions)
+
+        self.client.post(self.url, {'action': 'delete_users', ACTION_CHECKBOX_NAME: [str(self.live.pk)]})
+        user = User.all_objects.get(pk=self.live.pk)
+        self.assertIsNotNone(user.deleted_at)
+        self.assertFalse(user.is_active)
+        self.assertEqual(User.objects.count(), 0)
+
+    @override_settings(USER_SOFT_DELETE=0)
+    def test_hard_delete_action(self):
+        """
+        Ensure the delete action deletes the rows when soft delete is off, like deleting a single user does.
+        """
+        user_cache.set_users([{'id': str(self.live.pk), 'username': self.live.username}])
+        self.client.post(self.url, {
+            'action': 'delete_users',
+            ACTION_CHECKBOX_NAME: [str(self.live.pk), str(self.deleted.pk)],
+        })
+
+        self.assertFalse(User.all_objects.exists())
+        deleted = UserChange.objects.filter(action=UserChange.Action.DELETED).values_list('user_id', flat=True)
+        self.assertEqual(set(deleted), {self.live.pk, self.deleted.pk})
+        self.assertEqual(user_cache.get_users([self.live.pk]), {})
+
+
+@skipUnless(apps.is_installed('django.contrib.admin'), 'Admin is not installed')
+@override_settings(USER_BULK_UPDATE_BATCH_SIZE=1, USER_CHANGES_SETTLE_TIME=0)
+class UserAdminChangeLogTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin@123')
+        self.client.force_login(admin)
+        self.users = User.objects.bulk_create([User(username='user%d' % index, password='test@123')
+                                               for index in range(3)])
+
+    def test_action_commits_changes_per_batch(self):
+        """
+        Ensure an action on all the users commits the changes of each batch before it writes the next one, so the
+        change feed does not move past a change committed late.
+        """
+        commits = []
+        record = changelog.record
+
+        def record_batch(action, users):
+            commits.append(connection_commit.call_count)
+            record(action, users)
+
+        with mock.patch.object(connection, 'commit', wraps=connection.commit) as connection_commit, \
+                mock.patch('users.admin.changelog.record', side_effect=record_batch):
+            self.client.post(reverse('admin:users_user_changelist'), {
+                'action': 'deactivate_users',
+                'select_across': '1',
+                'index': '0',
+                ACTION_CHECKBOX_NAME: [str(self.users[0].pk)],
+            })
+
+        self.assertEqual(commits, [commits[0], commits[0] + 1, commits[0] + 2])
+        response = self.client.get(reverse('users:user-changes'), format='json')
+        self.assertEqual(len(response.data['data']['results']), 3)
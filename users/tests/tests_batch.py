@@ -0,0 +1,86 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import cache as user_cache
+from ..models import User
+
+
+class UserBatchTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-batch')
+        self.users = [User.objects.create(username='user%d' % index, password='test@123') for index in range(3)]
+        self.ids = [str(user.pk) for user in self.users]
+
+    def test_order_and_missing(self):
+        """
+        Ensure the users are returned in the order of the ids and unknown ids are reported.
+        """
+        unknown = str(uuid.uuid4())
+        ids = [self.ids[2], unknown, self.ids[0], self.ids[2]]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'ids': ','.join(ids)}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual([user['id'] for user in data['results']], [self.ids[2], self.ids[0]])
+        self.assertEqual(data['missing'], [unknown])
+        self.assertNotIn('password', data['results'][0])
+        self.assertEqual(len(queries), 1)
+
+    def test_post_and_cache(self):
+        """
+        Ensure cached users are not queried and the fetched users are cached.
+        """
+        self.client.post(self.url, {'ids': self.ids[:2]}, format='json')
+        self.assertEqual(set(user_cache.get_users(self.ids)), set(self.ids[:2]))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'ids': self.ids}, format='json')
+        self.assertEqual([user['id'] for user in response.data['data']['results']], self.ids)
+        self.assertEqual(len(queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {'ids': self.ids}, format='json')
+        self.assertEqual(len(queries), 0)
+
+    def test_updated_and_deleted_users(self):
+        """
+        Ensure an update or delete is not hidden by the cache.
+        """
+        self.client.post(self.url, {'ids': self.ids}, format='json')
+        self.client.patch(reverse('users:user-detail', kwargs={'pk': self.ids[0]}), {'first_name': 'New'},
+                          format='json')
+        self.client.delete(reverse('users:user-detail', kwargs={'pk': self.ids[1]}), format='json')
+
+        data = self.client.post(self.url, {'ids': self.ids}, format='json').data['data']
+        self.assertEqual(data['results'][0]['first_name'], 'New')
+        self.assertEqual(data['missing'], [self.ids[1]])
+
+    def test_invalid_ids(self):
+        """
+        Ensure invalid, missing and too many ids are rejected.
+        """
+        response = self.client.get(self.url, {'ids': 'abc'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ids', response.data['errors'])
+
+        self.assertEqual(self.client.get(self.url, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        ids = [str(uuid.uuid4()) for index in range(settings.USER_BATCH_MAX_IDS + 1)]
+        response = self.client.post(self.url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(USER_BATCH_MAX_IDS=2):
+            response = self.client.post(self.url, {'ids': [str(user.pk) for user in self.users]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
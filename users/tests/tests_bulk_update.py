@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import cache as user_cache
+from ..bulk import bulk_update
+from ..models import User, UserSearchToken
+
+
+class UserBulkUpdateTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-bulk-update')
+        self.users = [User.objects.create(username='user%d' % index, first_name='First', password='test@123')
+                      for index in range(5)]
+
+    def __bulk_update(self, **data):
+        return self.client.post(self.url, data, format='json')
+
+    def test_deactivate_users(self):
+        """
+        Ensure the matching users are updated without saving them and dropped from the cache.
+        """
+        user = self.users[0]
+        user_cache.set_users([{'id': str(user.pk), 'username': user.username}])
+        ids = [str(user.pk) for user in self.users[:3]]
+
+        with mock.patch.object(User, 'save') as save:
+            response = self.__bulk_update(filter={'ids': ids}, values={'is_active': False})
+            save.assert_not_called()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], {'matched': 3, 'updated': 3, 'dry_run': False})
+        self.assertEqual(User.objects.filter(is_active=False).count(), 3)
+        self.assertEqual(User.objects.get(pk=user.pk).password, user.password)
+        self.assertGreater(User.objects.get(pk=user.pk).updated, user.updated)
+        self.assertEqual(user_cache.get_users([user.pk]), {})
+
+    def test_unchanged_users_are_not_updated(self):
+        """
+        Ensure users which already have the values are matched but not updated.
+        """
+        User.objects.filter(pk=self.users[0].pk).update(is_active=False)
+
+        response = self.__bulk_update(filter={'is_active': True}, values={'is_active': False})
+        self.assertEqual(response.data['data'], {'matched': 4, 'updated': 4, 'dry_run': False})
+
+        response = self.__bulk_update(filter={'usernames': ['user0', 'user1']}, values={'is_active': False})
+        self.assertEqual(response.data['data'], {'matched': 2, 'updated': 0, 'dry_run': False})
+
+    def test_dry_run(self):
+        """
+        Ensure a dry run counts the users which would change and updates nothing.
+        """
+        User.objects.filter(pk=self.users[0].pk).update(is_active=False)
+
+        response = self.__bulk_update(filter={'created_after': '2000-01-01T00:00:00Z'}, values={'is_active': False},
+                                      dry_run=True)
+        self.assertEqual(response.data['data'], {'matched': 5, 'updated': 4, 'dry_run': True})
+        self.assertEqual(User.objects.filter(is_active=False).count(), 1)
+
+    def test_batches_and_search_index(self):
+        """
+        Ensure all the batches are updated and a changed name is reindexed for the search.
+        """
+        matched, updated = bulk_update(User.objects.all(), {'first_name': 'Renamed'}, batch_size=2)
+
+        self.assertEqual((matched, updated), (5, 5))
+        self.assertEqual(User.objects.filter(first_name='Renamed').count(), 5)
+        tokens = UserSearchToken.objects.filter(field=UserSearchToken.Field.FIRST_NAME)
+        self.assertEqual(tokens.filter(token='ren').count(), 5)
+        self.assertFalse(tokens.filter(token='fir').exists())
+
+    def test_deleted_users_are_not_updated(self):
+        """
+        Ensure soft deleted users are not matched.
+        """
+        self.users[0].soft_delete()
+
+        response = self.__bulk_update(filter={'is_active': False}, values={'is_active': True})
+        self.assertEqual(response.data['data'], {'matched': 0, 'updated': 0, 'dry_run': False})
+        self.assertFalse(User.all_objects.get(pk=self.users[0].pk).is_active)
+
+    def test_invalid_request(self):
+        """
+        Ensure a filter and a value are required and only the supported fields can be set.
+        """
+        response = self.__bulk_update(filter={}, values={'is_active': False})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('filter', response.data['errors'])
+
+        response = self.__bulk_update(filter={'is_active': True}, values={'password': 'secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('values', response.data['errors'])
+        self.assertEqual(User.objects.filter(is_active=True).count(), 5)
+
+    @override_settings(USER_BULK_UPDATE_MAX_ITEMS=2)
+    def test_too_many_items(self):
+        """
+        Ensure the filter lists are limited by the active settings.
+        """
+        response = self.__bulk_update(filter={'usernames': ['user0', 'user1', 'user2']}, values={'is_active': False})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('filter', response.data['errors'])
+        self.assertEqual(User.objects.filter(is_active=True).count(), 5)
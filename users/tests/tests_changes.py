@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import changelog
+from ..models import User, UserChange
+
+
+@override_settings(USER_CHANGES_SETTLE_TIME=0)
+class UserChangesTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-changes')
+
+    def __create_user(self, username):
+        response = self.client.post(reverse('users:user-list'), {'username': username, 'password': 'test@123'},
+                                    format='json')
+        return response.data['data']['id']
+
+    def __changes(self, **params):
+        return self.client.get(self.url, params, format='json')
+
+    def test_mutations_are_logged(self):
+        """
+        Ensure create, update and destroy log their change and the feed returns them in order.
+        """
+        user_id = self.__create_user('test')
+        url = reverse('users:user-detail', kwargs={'pk': user_id})
+        self.client.patch(url, {'first_name': 'Test'}, format='json')
+        self.client.delete(url, format='json')
+
+        response = self.__changes()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual([change['action'] for change in data['results']], ['created', 'updated', 'deleted'])
+        self.assertEqual({str(change['user_id']) for change in data['results']}, {user_id})
+        self.assertEqual(data['results'][1]['user']['first_name'], 'Test')
+        self.assertNotIn('password', data['results'][1]['user'])
+        self.assertIsNone(data['results'][2]['user'])
+        self.assertEqual(data['next'], data['results'][2]['cursor'])
+        self.assertFalse(data['has_more'])
+
+        response = self.__changes(since=data['next'])
+        self.assertEqual(response.data['data']['results'], [])
+        self.assertEqual(response.data['data']['next'], data['next'])
+
+    def test_failed_mutation_is_not_logged(self):
+        """
+        Ensure the change is rolled back with the mutation.
+        """
+        with mock.patch('users.changelog.UserChange.objects.bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.__create_user('test')
+        self.assertFalse(User.objects.exists())
+
+    @override_settings(USER_SOFT_DELETE=0)
+    def test_hard_delete_is_logged(self):
+        """
+        Ensure deleting the row logs the id of the deleted user.
+        """
+        user_id = self.__create_user('test')
+        self.client.delete(reverse('users:user-detail', kwargs={'pk': user_id}), format='json')
+
+        change = UserChange.objects.last()
+        self.assertEqual((str(change.user_id), change.action), (user_id, UserChange.Action.DELETED))
+
+    def test_limit_and_compact(self):
+        """
+        Ensure a batch is limited and the compact batch keeps the latest change of each user.
+        """
+        first = self.__create_user('first')
+        second = self.__create_user('second')
+        self.client.patch(reverse('users:user-detail', kwargs={'pk': first}), {'last_name': 'One'}, format='json')
+
+        data = self.__changes(limit=2).data['data']
+        self.assertEqual(len(data['results']), 2)
+        self.assertTrue(data['has_more'])
+
+        data = self.__changes(compact='true').data['data']
+        self.assertEqual([(str(change['user_id']), change['action']) for change in data['results']],
+                         [(second, 'created'), (first, 'updated')])
+        self.assertEqual(data['next'], UserChange.objects.last().pk)
+
+    def test_cursor_out_of_range(self):
+        """
+        Ensure a cursor larger than a change id is rejected instead of overflowing the query.
+        """
+        response = self.__changes(since=10 ** 30)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('since', response.data['errors'])
+
+    @override_settings(USER_CHANGES_SETTLE_TIME=60)
+    def test_unsettled_changes_are_held_back(self):
+        """
+        Ensure the feed stops before a change which may still be overtaken by an earlier transaction.
+        """
+        self.__create_user('old')
+        self.__create_user('new')
+        UserChange.objects.filter(pk=UserChange.objects.first().pk).update(
+            created=timezone.now() - timedelta(minutes=5))
+
+        data = self.__changes().data['data']
+        self.assertEqual(len(data['results']), 1)
+
+    def test_long_poll(self):
+        """
+        Ensure an empty feed is checked again until a change arrives or the wait is over.
+        """
+        clock = [0]
+        calls = []
+
+        def sleep(seconds):
+            calls.append(seconds)
+            if len(calls) == 2:
+                User.objects.create(username='late', password='test@123')
+                changelog.record(UserChange.Action.CREATED, [User.objects.get(username='late')])
+            clock[0] += seconds
+
+        with override_settings(USER_CHANGES_POLL_INTERVAL=1):
+            changes, has_more = changelog.wait(0, 10, timeout=5, timer=lambda: clock[0], sleep=sleep)
+            self.assertEqual(len(changes), 1)
+            self.assertEqual(calls, [1, 1])
+
+            changes, has_more = changelog.wait(changes[0].pk, 10, timeout=2.5, timer=lambda: clock[0], sleep=sleep)
+            self.assertEqual(changes, [])
+            self.assertEqual(calls, [1, 1, 1, 1, 0.5])
+
+    def test_purge_old_changes(self):
+        """
+        Ensure the changes older than the retention are removed.
+        """
+        self.__create_user('old')
+        self.__create_user('new')
+        UserChange.objects.filter(pk=UserChange.objects.first().pk).update(created=timezone.now() - timedelta(days=8))
+
+        call_command('purge_user_changes', days=7, stdout=StringIO())
+        self.assertEqual(UserChange.objects.count(), 1)
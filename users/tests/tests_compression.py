@@ -0,0 +1,84 @@
+import gzip
+import json
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from service.middleware import CompressionMiddleware, brotli, negotiate
+from ..models import User
+
+
+class CompressionTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-list')
+        User.objects.bulk_create([User(username='user%d' % index, email='user%d@mail.com' % index,
+                                       password='test@123') for index in range(50)])
+
+    def __list(self, encoding, **params):
+        return self.client.get(self.url, dict(params, limit=50), format='json', HTTP_ACCEPT_ENCODING=encoding)
+
+    def test_negotiate(self):
+        """
+        Ensure the encoding with the highest quality value is chosen and refused encodings are not used.
+        """
+        self.assertEqual(negotiate('gzip, deflate'), 'gzip')
+        self.assertEqual(negotiate('gzip;q=0, deflate'), None)
+        self.assertEqual(negotiate('identity'), None)
+        self.assertEqual(negotiate('*'), 'br' if brotli else 'gzip')
+        self.assertEqual(negotiate('br;q=0.5, gzip;q=0.8'), 'gzip')
+
+    def test_gzip_list_page(self):
+        """
+        Ensure a large list page is compressed with gzip and varies by the accepted encoding.
+        """
+        plain = self.__list('')
+        response = self.__list('gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), json.loads(plain.content))
+
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+    @skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_list_page(self):
+        """
+        Ensure brotli is preferred when the client accepts it.
+        """
+        plain = self.__list('')
+        response = self.__list('gzip, deflate, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+    @override_settings(COMPRESSION_MIN_SIZE=100000)
+    def test_small_response_is_not_compressed(self):
+        """
+        Ensure responses below the minimum size are sent as they are.
+        """
+        response = self.__list('gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response(self):
+        """
+        Ensure streaming responses are compressed chunk by chunk and binary types are left alone.
+        """
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        chunks = [json.dumps({'index': index}).encode() + b'\n' for index in range(100)]
+        middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(
+            iter(chunks), content_type='application/x-ndjson'))
+
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+        middleware = CompressionMiddleware(lambda request: HttpResponse(b'\x89PNG' * 1000, content_type='image/png'))
+        self.assertFalse(middleware(request).has_header('Content-Encoding'))
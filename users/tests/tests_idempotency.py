@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from service.idempotency import cache_key
+from ..models import User
+
+
+class IdempotencyKeyTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-list')
+        self.data = {'username': 'test', 'password': 'test@123'}
+
+    def __create(self, data=None, key='key-1'):
+        return self.client.post(self.url, data or self.data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_gets_first_response(self):
+        """
+        Ensure a retry is answered from the first response without creating or hashing again.
+        """
+        first = self.__create()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with mock.patch('users.models.make_password') as make_password:
+            retry = self.__create()
+            make_password.assert_not_called()
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(User.objects.count(), 1)
+
+        # Another key is another request
+        response = self.__create(key='key-2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('username', response.data['errors'])
+
+    def test_key_reused_with_other_data(self):
+        """
+        Ensure a key used for other data is rejected.
+        """
+        self.__create()
+        response = self.__create(dict(self.data, username='other'))
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertIn('idempotency_key', response.data['errors'])
+        self.assertFalse(User.objects.filter(username='other').exists())
+
+    def test_validation_errors_are_replayed(self):
+        """
+        Ensure client errors are stored too.
+        """
+        first = self.__create({'username': 'test'})
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+
+        retry = self.__create({'username': 'test'})
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_partial_update(self):
+        """
+        Ensure an update retry is not applied again.
+        """
+        user = User.objects.create(**self.data)
+        url = reverse('users:user-detail', kwargs={'pk': user.pk})
+
+        first = self.client.patch(url, {'first_name': 'First'}, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        User.objects.filter(pk=user.pk).update(first_name='Changed')
+        retry = self.client.patch(url, {'first_name': 'First'}, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(User.objects.get(pk=user.pk).first_name, 'Changed')
+
+    def test_invalid_key(self):
+        """
+        Ensure an empty or too long key is rejected.
+        """
+        self.assertEqual(self.__create(key='').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.__create(key='k' * 256).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.exists())
+
+    def test_concurrent_request_waits_for_first_response(self):
+        """
+        Ensure a request arriving while the key is locked is answered with the response of the first request.
+        """
+        first = self.__create()
+        stored_key = cache_key(APIRequestFactory().post(self.url), 'key-1')
+        stored = cache.get(stored_key)
+        cache.delete(stored_key)
+        cache.add('%s:lock' % stored_key, 1)
+
+        def sleep(seconds):
+            # The first request finishes while the retry waits
+            cache.set(stored_key, stored)
+
+        with mock.patch('service.idempotency.time.sleep', side_effect=sleep) as patched_sleep:
+            retry = self.__create()
+            patched_sleep.assert_called_once()
+
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_expired_lock_of_other_request_is_kept(self):
+        """
+        Ensure a request whose lock expired while it was handled does not release the lock taken by another request.
+        """
+        stored_key = cache_key(APIRequestFactory().post(self.url), 'key-1')
+        lock_key = '%s:lock' % stored_key
+        save = User.save
+
+        def slow_save(user, *args, **kwargs):
+            # The lock expires and another request with the key takes it
+            cache.set(lock_key, 'other')
+            return save(user, *args, **kwargs)
+
+        with mock.patch.object(User, 'save', slow_save):
+            self.assertEqual(self.__create().status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(cache.get(lock_key), 'other')
+
+    def test_lock_is_released(self):
+        """
+        Ensure the lock is released once the response is stored.
+        """
+        self.__create()
+        self.assertIsNone(cache.get('%s:lock' % cache_key(APIRequestFactory().post(self.url), 'key-1')))
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_concurrent_request_times_out(self):
+        """
+        Ensure a request is rejected when the first request with the key does not finish in time.
+        """
+        stored_key = cache_key(APIRequestFactory().post(self.url), 'key-1')
+        cache.add('%s:lock' % stored_key, 1)
+
+        response = self.__create()
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(User.objects.exists())
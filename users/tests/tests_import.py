@@ -0,0 +1,171 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import imports
+from ..models import User, UserImportJob, UserSearchToken
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, USER_IMPORT_CHUNK_SIZE=2, USER_IMPORT_HASH_WORKERS=2)
+class UserImportTests(APITestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super(UserImportTests, cls).tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-import-list')
+        User.objects.create(username='taken', password='test@123')
+
+    def __upload(self, name, content, **data):
+        upload = SimpleUploadedFile(name, content.encode(), content_type='application/octet-stream')
+        return self.client.post(self.url, dict(data, file=upload), format='multipart')
+
+    def __process(self, job_id):
+        call_command('process_user_imports', stdout=StringIO())
+        return self.client.get(reverse('users:user-import-detail', kwargs={'job_id': job_id}), format='json')
+
+    def test_import_csv(self):
+        """
+        Ensure a CSV file is imported in chunks and the rejected rows are reported with their line numbers.
+        """
+        hashed = make_password('legacy@123')
+        content = (
+            'username,password,first_name,email,dob\n'
+            'alice,alice@123,Alice,alice@mail.com,1990-01-01\n'
+            'bob,%s,Bob,bob@mail.com,\n'
+            'taken,test@123,Taken,,\n'
+            'carol,carol@123,Carol,not-an-email,\n'
+            'alice,alice@123,Alice,,\n'
+            'dave,dave@123,Dave,,\n'
+        ) % hashed
+        response = self.__upload('users.csv', content)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['data']['format'], 'csv')
+        self.assertEqual(response.data['data']['status'], 'pending')
+
+        response = self.__process(response.data['data']['id'])
+        data = response.data['data']
+        self.assertEqual(data['status'], 'completed')
+        self.assertEqual((data['processed_rows'], data['created_rows'], data['failed_rows']), (6, 3, 3))
+        self.assertEqual([error['row'] for error in data['row_errors']], [4, 5, 6])
+        self.assertIn('username', data['row_errors'][0]['errors'])
+        self.assertIn('email', data['row_errors'][1]['errors'])
+
+        alice = User.objects.get(username='alice')
+        self.assertTrue(check_password('alice@123', alice.password))
+        self.assertEqual(str(alice.dob), '1990-01-01')
+        # A hash is only stored as it is by a job with hashed passwords
+        self.assertTrue(check_password(hashed, User.objects.get(username='bob').password))
+        self.assertTrue(UserSearchToken.objects.filter(user=alice, token='ali').exists())
+        self.assertFalse(UserImportJob.objects.get(pk=data['id']).file)
+
+    def test_import_hashed_passwords(self):
+        """
+        Ensure a job with hashed passwords stores the hashes and rejects plain-text passwords.
+        """
+        hashed = make_password('legacy@123')
+        content = 'username,password\nbob,%s\ncarol,carol@123\n' % hashed
+        response = self.__upload('users.csv', content, hashed_passwords=True)
+        self.assertTrue(response.data['data']['hashed_passwords'])
+
+        data = self.__process(response.data['data']['id']).data['data']
+        self.assertEqual((data['created_rows'], data['failed_rows']), (1, 1))
+        self.assertIn('password', data['row_errors'][0]['errors'])
+        self.assertEqual(User.objects.get(username='bob').password, hashed)
+
+    def test_import_ndjson(self):
+        """
+        Ensure a NDJSON file is imported and invalid lines are reported.
+        """
+        lines = [
+            json.dumps({'username': 'erin', 'password': 'erin@123', 'is_active': False}),
+            '',
+            '{not json',
+            json.dumps(['frank']),
+            json.dumps({'username': 'grace', 'password': 'grace@123'}),
+        ]
+        response = self.__upload('users.jsonl', '\n'.join(lines))
+        self.assertEqual(response.data['data']['format'], 'ndjson')
+
+        data = self.__process(response.data['data']['id']).data['data']
+        self.assertEqual((data['processed_rows'], data['created_rows'], data['failed_rows']), (4, 2, 2))
+        self.assertEqual([error['row'] for error in data['row_errors']], [3, 4])
+        self.assertFalse(User.objects.get(username='erin').is_active)
+
+    @override_settings(USER_IMPORT_MAX_ERRORS=1)
+    def test_row_errors_are_capped(self):
+        """
+        Ensure all rejected rows are counted but only the first ones are kept.
+        """
+        response = self.__upload('users.csv', 'username,password\ntaken,a\ntaken,b\ntaken,c\n')
+
+        data = self.__process(response.data['data']['id']).data['data']
+        self.assertEqual(data['failed_rows'], 3)
+        self.assertEqual(len(data['row_errors']), 1)
+
+    @override_settings(USER_IMPORT_STALE_AFTER=60)
+    def test_stale_running_import_fails(self):
+        """
+        Ensure a running import whose worker stopped is failed instead of reported as running forever.
+        """
+        now = timezone.now()
+        stale = UserImportJob.objects.create(format='csv', status=UserImportJob.Status.RUNNING, processed_rows=2,
+                                             started=now - timedelta(minutes=5), heartbeat=now - timedelta(minutes=2))
+        running = UserImportJob.objects.create(format='csv', status=UserImportJob.Status.RUNNING, started=now,
+                                               heartbeat=now)
+
+        data = self.client.get(reverse('users:user-import-detail', kwargs={'job_id': stale.pk}),
+                               format='json').data['data']
+        self.assertEqual((data['status'], data['processed_rows']), ('failed', 2))
+        self.assertTrue(data['message'])
+        self.assertEqual(UserImportJob.objects.get(pk=running.pk).status, UserImportJob.Status.RUNNING)
+
+    def test_stale_job_is_not_completed(self):
+        """
+        Ensure a worker which lost its job to the stale check stops importing it.
+        """
+        job_id = self.__upload('users.csv', 'username,password\nalice,alice@123\nbob,bob@123\ncarol,carol@123\n'
+                               ).data['data']['id']
+        chunk = imports.import_chunk
+
+        def import_stale_chunk(*args):
+            UserImportJob.objects.filter(pk=job_id).update(status=UserImportJob.Status.FAILED)
+            return chunk(*args)
+
+        with mock.patch('users.imports.import_chunk', side_effect=import_stale_chunk) as patched_chunk:
+            self.assertTrue(imports.run_import(job_id))
+        patched_chunk.assert_called_once()
+        self.assertEqual(UserImportJob.objects.get(pk=job_id).status, UserImportJob.Status.FAILED)
+
+    def test_invalid_upload(self):
+        """
+        Ensure a file with an unknown format is rejected and an unknown import is not found.
+        """
+        response = self.__upload('users.txt', 'username,password\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('format', response.data['errors'])
+
+        response = self.__upload('users.txt', 'username,password\n', format='csv')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        url = reverse('users:user-import-detail', kwargs={'job_id': 'abc'})
+        self.assertEqual(self.client.get(url, format='json').status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,136 @@
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import User
+from ..tokens import issue_token
+
+
+class UserLoginTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='test', password='test@123')
+        self.login_url = reverse('users:user-login')
+        self.verify_url = reverse('users:user-verify')
+
+    def __login(self, password='test@123'):
+        return self.client.post(self.login_url, {'username': 'test', 'password': password}, format='json')
+
+    def test_login_user(self):
+        """
+        Ensure a user can log in and gets a token.
+        """
+        response = self.__login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data.get('errors'))
+        self.assertIsInstance(response.data.get('data').get('token'), str)
+        self.assertEqual(response.data.get('data').get('user').get('id'), str(self.user.id))
+        self.assertNotIn('password', response.data.get('data').get('user'))
+
+    def test_login_user_with_wrong_password(self):
+        """
+        Ensure a wrong password is rejected.
+        """
+        response = self.__login(password='wrong')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(response.data.get('data'))
+        self.assertIsNotNone(response.data.get('errors'))
+
+    def test_login_inactive_user(self):
+        """
+        Ensure an inactive user can not log in.
+        """
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.__login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_user_after_partial_update(self):
+        """
+        Ensure saving a user without a new password keeps the password hash.
+        """
+        url = reverse('users:user-detail', kwargs={'pk': self.user.pk})
+        self.client.patch(url, {'first_name': 'Test'}, format='json')
+
+        self.assertEqual(self.__login().status_code, status.HTTP_200_OK)
+
+    def test_password_looking_like_a_hash(self):
+        """
+        Ensure a password in the format of a hash is hashed like any other password.
+        """
+        password = 'pbkdf2_sha256$1$salt$notreallyahash'
+        response = self.client.post(reverse('users:user-list'), {'username': 'hash', 'password': password},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(User.objects.get(username='hash').password, password)
+
+        response = self.client.post(self.login_url, {'username': 'hash', 'password': password}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_login_with_updated_password(self):
+        """
+        Ensure a password given in an update is hashed.
+        """
+        url = reverse('users:user-detail', kwargs={'pk': self.user.pk})
+        self.client.patch(url, {'password': 'new@123'}, format='json')
+
+        self.assertEqual(self.__login().status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.__login(password='new@123').status_code, status.HTTP_200_OK)
+
+    def test_login_rehashes_password(self):
+        """
+        Ensure the password is rehashed when the hasher iterations changed.
+        """
+        hashers = ['users.hashers.ConfigurablePBKDF2PasswordHasher']
+        with override_settings(PASSWORD_HASHERS=hashers, PASSWORD_HASHER_ITERATIONS=2000):
+            User.objects.filter(pk=self.user.pk).update(password=make_password('test@123'))
+
+        with override_settings(PASSWORD_HASHERS=hashers, PASSWORD_HASHER_ITERATIONS=1000):
+            response = self.__login()
+
+            password = User.objects.get(pk=self.user.pk).password
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(password.startswith('pbkdf2_sha256$1000$'))
+            self.assertTrue(check_password('test@123', password))
+
+    def test_verify_token(self):
+        """
+        Ensure a token is verified from the cache without a database query once the user was loaded.
+        """
+        token = self.__login().data.get('data').get('token')
+
+        with self.assertNumQueries(0):
+            response = self.client.post(self.verify_url, {'token': token}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get('data').get('user').get('id'), str(self.user.id))
+
+    def test_verify_token_after_update(self):
+        """
+        Ensure an update drops the cached user, so a deactivated user's token is rejected.
+        """
+        token = self.__login().data.get('data').get('token')
+
+        url = reverse('users:user-detail', kwargs={'pk': self.user.pk})
+        self.client.patch(url, {'is_active': False}, format='json')
+        response = self.client.post(self.verify_url, {'token': token}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_verify_invalid_token(self):
+        """
+        Ensure tampered and expired tokens are rejected.
+        """
+        token = issue_token(self.user)
+
+        response = self.client.post(self.verify_url, {'token': token + 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(USER_TOKEN_MAX_AGE=-1):
+            response = self.client.post(self.verify_url, {'token': token}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
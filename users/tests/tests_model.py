@@ -0,0 +1,218 @@
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DataError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from service.utils import uuid7
+from .. import fields
+from ..fields import CompactUUIDField, check_storage
+from ..models import User
+
+
+class UserIdTests(TestCase):
+
+    def test_uuid7_version_and_variant(self):
+        """
+        Ensure the time ordered UUID is a valid RFC 4122 variant version 7 UUID.
+        """
+        value = uuid7()
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, 'specified in RFC 4122')
+        self.assertEqual(len(value.hex), 32)
+
+    def test_uuid7_time_ordered(self):
+        """
+        Ensure the time ordered UUIDs of later milliseconds sort after the earlier ones.
+        """
+        with mock.patch.object(time, 'time', side_effect=[1.0, 2.0, 3.0]):
+            values = [uuid7() for _ in range(3)]
+
+        self.assertEqual(sorted(values), values)
+        self.assertEqual(sorted(value.hex for value in values), [value.hex for value in values])
+
+    @override_settings(USER_ID_VERSION=7)
+    def test_user_id_version_7(self):
+        """
+        Ensure the user id is time ordered when selected by the setting.
+        """
+        user = User.objects.create(username='test', password='test@123')
+
+        self.assertEqual(user.id.version, 7)
+
+    def test_user_id_version_4(self):
+        """
+        Ensure the user id is random by default.
+        """
+        user = User.objects.create(username='test', password='test@123')
+
+        self.assertEqual(user.id.version, 4)
+
+
+class CompactUUIDFieldTests(TestCase):
+
+    def setUp(self):
+        self.field = CompactUUIDField()
+        self.mysql = mock.Mock(vendor='mysql', data_types={'UUIDField': 'char(32)'})
+        self.value = uuid.uuid4()
+
+    @override_settings(USER_ID_BINARY=1)
+    def test_binary_storage_on_mysql(self):
+        """
+        Ensure the ids are stored as 16 bytes on MySQL and read back as UUIDs.
+        """
+        self.assertEqual(self.field.db_type(self.mysql), 'binary(16)')
+        self.assertEqual(self.field.get_db_prep_value(str(self.value), self.mysql), self.value.bytes)
+        self.assertEqual(self.field.from_db_value(self.value.bytes, None, self.mysql), self.value)
+
+    @override_settings(USER_ID_BINARY=0)
+    def test_char_storage_on_mysql(self):
+        """
+        Ensure the ids keep the char(32) storage when the binary storage is off.
+        """
+        self.mysql.features.has_native_uuid_field = False
+
+        self.assertEqual(self.field.db_type(self.mysql), 'char(32)')
+        self.assertEqual(self.field.get_db_prep_value(self.value, self.mysql), self.value.hex)
+        self.assertEqual(self.field.from_db_value(self.value.hex, None, self.mysql), self.value)
+
+    @override_settings(USER_ID_BINARY=1)
+    def test_lookup_by_string_id(self):
+        """
+        Ensure a user is found by the string form of the id used by the API.
+        """
+        user = User.objects.create(username='test', password='test@123')
+
+        self.assertEqual(User.objects.get(pk=str(user.pk)), user)
+        self.assertIsInstance(User.objects.values_list('pk', flat=True).get(), uuid.UUID)
+
+    def mysql_connection(self, column_type):
+        self.mysql.cursor = mock.MagicMock()
+        self.mysql.cursor.return_value.__enter__.return_value.fetchone.return_value = (column_type,)
+        self.mysql.alias = 'mysql'
+        self.addCleanup(fields._checked.discard, 'mysql')
+        return self.mysql
+
+    @override_settings(USER_ID_BINARY=1)
+    @mock.patch.object(fields.MigrationRecorder, 'applied_migrations', return_value={fields.STORAGE_MIGRATION: None})
+    def test_storage_mismatch_fails_fast(self, applied_migrations):
+        """
+        Ensure the first connection fails when the setting does not match the stored id column.
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            check_storage(None, self.mysql_connection('char'))
+
+    @override_settings(USER_ID_BINARY=1)
+    @mock.patch.object(fields.MigrationRecorder, 'applied_migrations', return_value={fields.STORAGE_MIGRATION: None})
+    def test_storage_match_is_checked_once(self, applied_migrations):
+        """
+        Ensure a matching id column is accepted and not checked again on the next connections.
+        """
+        connection = self.mysql_connection('binary')
+        check_storage(None, connection)
+        check_storage(None, connection)
+
+        self.assertEqual(connection.cursor.call_count, 1)
+
+    @override_settings(USER_ID_BINARY=1)
+    @mock.patch.object(fields.MigrationRecorder, 'applied_migrations', return_value={})
+    def test_storage_not_checked_before_migration(self, applied_migrations):
+        """
+        Ensure the id column is not checked before the conversion migration ran.
+        """
+        connection = self.mysql_connection('char')
+        check_storage(None, connection)
+
+        connection.cursor.assert_not_called()
+
+
+class UserModelTests(TestCase):
+
+    def test_set_password(self):
+        """
+        Ensure set_password hashes the password and save keeps the stored hash.
+        """
+        user = User(username='test')
+        user.set_password('test@123')
+        user.save()
+        hashed = user.password
+
+        self.assertNotEqual(hashed, 'test@123')
+        self.assertTrue(check_password('test@123', hashed))
+
+        user.first_name = 'Test'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).password, hashed)
+
+    def test_create_never_stores_raw_password(self):
+        """
+        Ensure a password given to create or assigned to a user is hashed, even when it looks like a hash.
+        """
+        looks_hashed = make_password('other')
+        for raw_password in ('test@123', looks_hashed):
+            user = User.objects.create(username='test-%d' % len(raw_password), password=raw_password)
+            stored = User.objects.values_list('password', flat=True).get(pk=user.pk)
+            self.assertNotEqual(stored, raw_password)
+            self.assertTrue(check_password(raw_password, stored))
+
+        user = User.objects.get(username='test-8')
+        user.password = 'new@123'
+        user.save()
+        self.assertTrue(check_password('new@123', User.objects.get(pk=user.pk).password))
+
+    def test_save_refreshes_updated(self):
+        """
+        Ensure every save moves the updated time forward.
+        """
+        user = User.objects.create(username='test', password='test@123')
+        updated = user.updated
+
+        user.save()
+        self.assertGreater(user.updated, updated)
+
+    def test_soft_delete(self):
+        """
+        Ensure a soft deleted user is inactive and only found through all_objects.
+        """
+        user = User.objects.create(username='test', password='test@123')
+        password = user.password
+        user.soft_delete()
+
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        deleted = User.all_objects.get(pk=user.pk)
+        self.assertIsNotNone(deleted.deleted_at)
+        self.assertFalse(deleted.is_active)
+        self.assertEqual(deleted.password, password)
+
+    def test_default_ordering(self):
+        """
+        Ensure the users are ordered newest first.
+        """
+        now = timezone.now()
+        for index, username in enumerate(('first', 'second', 'third')):
+            user = User.objects.create(username=username, password='test@123')
+            User.objects.filter(pk=user.pk).update(created=now + timedelta(seconds=index))
+
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['third', 'second', 'first'])
+
+    def test_avatar_path(self):
+        """
+        Ensure the avatar is stored in the directory of the user.
+        """
+        user = User(username='test')
+
+        self.assertEqual(user.user_directory_path('avatar.png'), 'user_%s/avatar.png' % user.pk)
+
+    @skipUnless(connection.vendor == 'mysql', 'MySQL only, run the tests with TEST_DATABASE=mysql')
+    def test_strict_mode_on_mysql(self):
+        """
+        Ensure MySQL rejects a too long value instead of truncating it.
+        """
+        with self.assertRaises(DataError):
+            User.objects.bulk_create([User(username='u' * 151, password='test@123')])
@@ -0,0 +1,75 @@
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ..models import User
+
+
+@override_settings(PAGINATION_MAX_LIMIT=20)
+class PaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([User(username='user%d' % index, email='user%d@mail.com' % index,
+                                       password='test@123') for index in range(300)])
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-list')
+
+    def __list(self, **params):
+        return self.client.get(self.url, params, format='json')
+
+    def test_default_limit(self):
+        """
+        Ensure the page size of the settings is the default limit.
+        """
+        data = self.__list().data['data']
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(data['count'], 300)
+
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, PAGE_SIZE=5)):
+            self.assertEqual(len(self.__list().data['data']['results']), 5)
+
+        # The default never exceeds the max limit
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, PAGE_SIZE=50)):
+            self.assertEqual(len(self.__list().data['data']['results']), 20)
+
+    def test_limit_is_clamped(self):
+        """
+        Ensure a limit above the max limit is clamped in the query and the next link.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            data = self.__list(limit=1000000).data['data']
+
+        self.assertEqual(len(data['results']), 20)
+        self.assertIn('limit=20', data['next'])
+        self.assertTrue(any('LIMIT 20' in query['sql'] for query in queries.captured_queries))
+
+    def test_memory_is_bounded(self):
+        """
+        Ensure a huge limit uses no more memory than a page of the max limit.
+        """
+
+        def peak(**params):
+            tracemalloc.start()
+            try:
+                self.__list(**params)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        # Warm up the caches of the first request
+        self.__list(limit=20)
+        bounded = peak(limit=20)
+        self.assertLess(peak(limit=1000000), bounded * 1.5)
+
+        # Without the bound the whole table is loaded
+        with override_settings(PAGINATION_MAX_LIMIT=300):
+            self.assertGreater(peak(limit=1000000), bounded * 3)
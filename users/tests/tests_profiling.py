@@ -0,0 +1,112 @@
+import os
+import pstats
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from service import profiling
+from ..models import User
+
+
+@override_settings(PROFILING_SAMPLE_RATE=0, PROFILING_HEADER_ENABLED=1, PROFILING_MAX_PROFILES=2,
+                   PROFILING_TOKEN='secret')
+class ProfilingTests(APITestCase):
+
+    def setUp(self):
+        profiling.profile_cache().clear()
+        User.objects.create(username='test', password='test@123')
+
+    def __list_users(self, **headers):
+        return self.client.get(reverse('users:user-list'), format='json', **headers)
+
+    def test_flagged_request_is_profiled(self):
+        """
+        Ensure a request with the profile header is profiled and its stats are downloadable with the token.
+        """
+        self.assertFalse(self.__list_users().has_header('X-Profile-Id'))
+        profile_id = self.__list_users(HTTP_X_PROFILE='1', HTTP_X_PROFILING_TOKEN='secret')['X-Profile-Id']
+
+        url = reverse('profile-list')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url, HTTP_X_PROFILING_TOKEN='other').status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url, HTTP_X_PROFILING_TOKEN='secret')
+        self.assertEqual([profile['id'] for profile in response.json()['data']], [profile_id])
+        self.assertEqual(response.json()['data'][0]['path'], reverse('users:user-list'))
+
+        url = reverse('profile-detail', kwargs={'profile_id': profile_id})
+        response = self.client.get(url, HTTP_X_PROFILING_TOKEN='secret')
+        with tempfile.NamedTemporaryFile(suffix='.prof') as profile_file:
+            profile_file.write(response.content)
+            profile_file.flush()
+            functions = {name for filename, line, name in pstats.Stats(profile_file.name).stats}
+        self.assertIn('list', functions)
+
+        response = self.client.get(url, {'format': 'collapsed'}, HTTP_X_PROFILING_TOKEN='secret')
+        lines = response.content.decode().splitlines()
+        self.assertTrue(any('list (views.py' in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+
+    def test_header_requires_token(self):
+        """
+        Ensure the profile header is ignored without the profiling token.
+        """
+        self.assertFalse(self.__list_users(HTTP_X_PROFILE='1').has_header('X-Profile-Id'))
+        self.assertFalse(self.__list_users(HTTP_X_PROFILE='1', HTTP_X_PROFILING_TOKEN='other')
+                         .has_header('X-Profile-Id'))
+
+        with override_settings(PROFILING_TOKEN=''):
+            self.assertFalse(self.__list_users(HTTP_X_PROFILE='1', HTTP_X_PROFILING_TOKEN='')
+                             .has_header('X-Profile-Id'))
+
+    def test_sampling(self):
+        """
+        Ensure the sample rate is applied and the header is ignored when disabled.
+        """
+        with override_settings(PROFILING_HEADER_ENABLED=0):
+            self.assertFalse(self.__list_users(HTTP_X_PROFILE='1', HTTP_X_PROFILING_TOKEN='secret')
+                             .has_header('X-Profile-Id'))
+
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            self.assertTrue(self.__list_users().has_header('X-Profile-Id'))
+
+    def test_slowest_profiles_are_kept(self):
+        """
+        Ensure only the slowest profiles are kept and the dropped stats are removed.
+        """
+        request = RequestFactory().get('/users')
+        ids = [profiling.store({}, request, 200, duration) for duration in (0.2, 0.1, 0.3)]
+
+        self.assertEqual([profile['id'] for profile in profiling.profiles()], [ids[2], ids[0]])
+        self.assertIsNone(profiling.get_stats(ids[1]))
+        self.assertIsNone(profiling.store({}, request, 200, 0.05))
+
+    def test_dump_profiles(self):
+        """
+        Ensure the command writes the profiles in the requested format.
+        """
+        profile_id = self.__list_users(HTTP_X_PROFILE='1', HTTP_X_PROFILING_TOKEN='secret')['X-Profile-Id']
+
+        with tempfile.TemporaryDirectory() as output:
+            stdout = StringIO()
+            call_command('dump_profiles', output=output, stdout=stdout)
+            self.assertIn(profile_id, stdout.getvalue())
+            pstats.Stats(os.path.join(output, '%s.prof' % profile_id))
+
+            call_command('dump_profiles', profile_id, format='collapsed', output=output, stdout=StringIO())
+            self.assertTrue(os.path.getsize(os.path.join(output, '%s.collapsed' % profile_id)))
+
+    def test_dump_profiles_from_process_local_cache(self):
+        """
+        Ensure the command fails instead of listing nothing when it can not see the profiles of the server processes.
+        """
+        caches = dict(settings.CACHES, profiling={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'})
+        with override_settings(CACHES=caches):
+            with self.assertRaises(CommandError):
+                call_command('dump_profiles', list=True, stdout=StringIO())
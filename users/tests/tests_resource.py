@@ -1,6 +1,7 @@
 import uuid
 from typing import Dict, Union
 
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -31,6 +32,9 @@ class UserTests(APITestCase):
             'is_active': True
         }
 
+    def setUp(self):
+        cache.clear()
+
     def __user_create(self, data: Union[dict, None] = None) -> User:
         """
         Crate a user
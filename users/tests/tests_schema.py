@@ -0,0 +1,67 @@
+import json
+from unittest import skipUnless
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+
+@skipUnless(apps.is_installed('drf_yasg'), 'API documentation is not installed')
+class OpenAPISchemaTests(APITestCase):
+
+    def setUp(self):
+        from service import views
+        views._schemas.clear()
+        self.url = reverse('schema-json', kwargs={'format': '.json'})
+
+    def test_schema_file_matches_dynamic_schema(self):
+        """
+        Ensure the pre-generated schema file matches the schema generated by the schema view.
+        Run the generate_openapi_schema command when this fails after an API change.
+        """
+        from service.schema import schema_view
+
+        request = APIRequestFactory().get('/swagger.json')
+        dynamic = schema_view.without_ui()(request, format='.json')
+        dynamic.render()
+        dynamic_schema = json.loads(dynamic.content)
+        # Only the dynamic schema knows the host of the request
+        dynamic_schema.pop('host', None)
+        dynamic_schema.pop('schemes', None)
+
+        with open(settings.OPENAPI_SCHEMA_FILE) as schema_file:
+            self.assertEqual(json.load(schema_file), dynamic_schema)
+
+    def test_schema_cache_headers(self):
+        """
+        Ensure the schema is served with an ETag and long cache headers.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('max-age=%d' % settings.OPENAPI_SCHEMA_MAX_AGE, response['Cache-Control'])
+        self.assertEqual(json.loads(response.content)['swagger'], '2.0')
+
+    def test_schema_not_modified(self):
+        """
+        Ensure a request with the current ETag is answered with 304.
+        """
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_yaml(self):
+        """
+        Ensure the schema is also served as YAML with its own ETag.
+        """
+        json_response = self.client.get(self.url)
+        response = self.client.get(reverse('schema-json', kwargs={'format': '.yaml'}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/yaml')
+        self.assertNotEqual(response['ETag'], json_response['ETag'])
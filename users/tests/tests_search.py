@@ -0,0 +1,159 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import User, UserSearchToken
+from ..search import MAX_QUERY_TRIGRAMS, normalize, query_trigrams, trigrams
+
+
+class UserSearchTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:user-search')
+        self.john = User.objects.create(username='john', first_name='John', last_name='Smith',
+                                        email='jsmith@mail.com', mobile_number='9876543210', password='test@123')
+        self.jane = User.objects.create(username='jane', first_name='Jane', last_name='Johnson',
+                                        email='jane@mail.com', mobile_number='1234567890', password='test@123')
+        self.zoe = User.objects.create(username='zoe', first_name='Zoë', last_name='Adams',
+                                       email='zoe@mail.com', mobile_number='5555555555', password='test@123')
+
+    def __search(self, q, **params):
+        return self.client.get(self.url, dict(params, q=q), format='json')
+
+    def test_normalize(self):
+        """
+        Ensure values are compared without case, accents and punctuation.
+        """
+        self.assertEqual(normalize('Zoë O\'Neil'), 'zoeoneil')
+        self.assertEqual(trigrams('smith'), {'smi', 'mit', 'ith'})
+
+    def test_search_users_ranked(self):
+        """
+        Ensure a fragment finds the users and ranks a prefix match above a contained match.
+        """
+        response = self.__search('john')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data.get('data').get('results')
+        self.assertEqual([user.get('username') for user in results], ['john', 'jane'])
+        self.assertGreater(results[0].get('score'), results[1].get('score'))
+        self.assertNotIn('password', results[0])
+
+    def test_search_users_by_fragment(self):
+        """
+        Ensure fragments in the middle of the email and mobile number are found.
+        """
+        self.assertEqual(self.__search('smith@mail').data.get('data').get('count'), 1)
+        self.assertEqual([user.get('id') for user in self.__search('654321').data.get('data').get('results')],
+                         [str(self.john.id)])
+        self.assertEqual(self.__search('zoe').data.get('data').get('results')[0].get('id'), str(self.zoe.id))
+
+    def test_long_query_counts_few_trigrams(self):
+        """
+        Ensure the postings of only a few trigrams of a long query are counted.
+        """
+        query = 'a' + 'bcdefghijklmnopqrstuvwxyz0123456789' * 4
+        grams = query_trigrams(query)
+        self.assertLessEqual(len(grams), MAX_QUERY_TRIGRAMS)
+        self.assertTrue(grams <= trigrams(query))
+        self.assertIn(query[:3], grams)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.__search(query[:150]).status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(queries), MAX_QUERY_TRIGRAMS + 2)
+
+    @override_settings(USER_SEARCH_MAX_CANDIDATES=1)
+    def test_exact_match_is_kept_when_candidates_are_cut(self):
+        """
+        Ensure an exact match is ranked even when there are more candidates than the cap.
+        """
+        User.objects.create(username='aaron', first_name='Johnny', password='test@123')
+        self.assertEqual(self.__search('john').data['data']['results'][0]['username'], 'john')
+
+        with override_settings(USER_SEARCH_COMMON_TOKEN_COUNT=1):
+            self.assertEqual(self.__search('john').data['data']['results'][0]['username'], 'john')
+
+    @override_settings(USER_SEARCH_COMMON_TOKEN_COUNT=1)
+    def test_search_users_with_common_fragment(self):
+        """
+        Ensure fragments made of common trigrams are searched with a contains scan.
+        """
+        response = self.__search('john')
+
+        results = response.data.get('data').get('results')
+        self.assertEqual([user.get('username') for user in results], ['john', 'jane'])
+
+    def test_search_requires_contiguous_fragment(self):
+        """
+        Ensure users having all the trigrams but not the fragment itself are not returned.
+        """
+        self.assertEqual(self.__search('smithjoh').data.get('data').get('count'), 0)
+
+    def test_search_limit(self):
+        """
+        Ensure the number of results is limited.
+        """
+        response = self.__search('mail', limit=1)
+
+        self.assertEqual(response.data.get('data').get('count'), 1)
+
+    def test_search_short_query(self):
+        """
+        Ensure queries shorter than three letters or digits are rejected.
+        """
+        response = self.__search('j.o')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('q', response.data.get('errors'))
+
+    def test_search_tokens_follow_updates(self):
+        """
+        Ensure updated and deleted users are searched by their current values.
+        """
+        url = reverse('users:user-detail', kwargs={'pk': self.john.pk})
+        self.client.patch(url, {'last_name': 'Brown', 'email': 'jbrown@mail.com'}, format='json')
+        self.client.delete(reverse('users:user-detail', kwargs={'pk': self.jane.pk}), format='json')
+
+        self.assertEqual(self.__search('smith').data.get('data').get('count'), 0)
+        self.assertEqual(self.__search('brown').data.get('data').get('count'), 1)
+        self.assertEqual(self.__search('johnson').data.get('data').get('count'), 0)
+
+    def test_unsearchable_update_keeps_tokens(self):
+        """
+        Ensure saving a user without a new searchable value does not rewrite its search tokens.
+        """
+        user = User.objects.get(pk=self.john.pk)
+        user.is_active = False
+        user.first_name = 'John'
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+            self.client.patch(reverse('users:user-detail', kwargs={'pk': self.john.pk}), {'dob': '1990-01-01'},
+                              format='json')
+
+        self.assertFalse(any('users_usersearchtoken' in query['sql'] for query in queries.captured_queries))
+
+        user.first_name = 'Jack'
+        user.save(update_fields=['is_active'])
+        self.assertEqual(self.__search('jack').data.get('data').get('count'), 0)
+        user.save()
+        self.assertEqual(self.__search('jack').data.get('data').get('count'), 1)
+
+    def test_rebuild_search_index(self):
+        """
+        Ensure the command indexes users created without signals.
+        """
+        User.objects.bulk_create([User(username='bulk', last_name='Bulkley', password='test@123')])
+        UserSearchToken.objects.all().delete()
+
+        call_command('rebuild_user_search_index', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(self.__search('bulkley').data.get('data').get('count'), 1)
+        self.assertEqual(self.__search('smith').data.get('data').get('count'), 1)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import User
+
+
+class UserSoftDeleteTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='test', password='test@123')
+
+    def test_destroy_user_soft_deletes(self):
+        """
+        Ensure deleting a user keeps the row marked as deleted and hides it from the API.
+        """
+        url = reverse('users:user-detail', kwargs={'pk': self.user.pk})
+        response = self.client.delete(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(User.objects.count(), 0)
+
+        user = User.all_objects.get(pk=self.user.pk)
+        self.assertIsNotNone(user.deleted_at)
+        self.assertFalse(user.is_active)
+        self.assertEqual(user.password, self.user.password)
+        self.assertEqual(self.client.get(url, format='json').status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(USER_SOFT_DELETE=0)
+    def test_destroy_user_hard_deletes(self):
+        """
+        Ensure the row is deleted when the soft delete mode is off.
+        """
+        url = reverse('users:user-detail', kwargs={'pk': self.user.pk})
+        response = self.client.delete(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(User.all_objects.count(), 0)
+
+    def test_create_user_with_soft_deleted_username(self):
+        """
+        Ensure the username of a soft deleted user is still reported as taken.
+        """
+        self.user.soft_delete()
+
+        url = reverse('users:user-list')
+        response = self.client.post(url, {'username': 'test', 'password': 'test@123'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('username', response.data.get('errors'))
+
+    def test_purge_deleted_users(self):
+        """
+        Ensure the purge command only removes the users deleted before the retention period in batches.
+        """
+        old = [User(username='old%d' % value, password='test@123') for value in range(5)]
+        User.objects.bulk_create(old)
+        User.all_objects.filter(username__startswith='old').update(deleted_at=timezone.now() - timedelta(days=40))
+        self.user.soft_delete()
+
+        out = StringIO()
+        call_command('purge_deleted_users', days=30, batch_size=2, sleep=0, stdout=out)
+
+        self.assertIn('Purged 5 users', out.getvalue())
+        self.assertEqual(list(User.all_objects.values_list('username', flat=True)), ['test'])
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from service.throttling import SlidingWindowRateThrottle
+
+REST_FRAMEWORK = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={
+    'client': '100/min',
+    'user.list': '2/min',
+})
+
+
+@override_settings(REST_FRAMEWORK=REST_FRAMEWORK)
+class UserThrottleTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_user_throttled(self):
+        """
+        Ensure requests over the action rate are rejected with the custom response structure.
+        """
+        url = reverse('users:user-list')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertIsNone(response.data.get('data'))
+        self.assertIsNotNone(response.data.get('errors'))
+
+    def test_forwarded_for_is_not_trusted(self):
+        """
+        Ensure a client changing the X-Forwarded-For header is still throttled when no proxy is configured.
+        """
+        url = reverse('users:user-list')
+        codes = [self.client.get(url, HTTP_X_FORWARDED_FOR='10.0.0.%d' % index).status_code for index in range(4)]
+
+        self.assertEqual(codes, [status.HTTP_200_OK] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS] * 2)
+
+    def test_forwarded_for_behind_proxy(self):
+        """
+        Ensure the client address is read from X-Forwarded-For behind the configured proxies.
+        """
+        url = reverse('users:user-list')
+        with override_settings(REST_FRAMEWORK=dict(REST_FRAMEWORK, NUM_PROXIES=1)):
+            codes = [self.client.get(url, HTTP_X_FORWARDED_FOR='10.0.0.%d' % index).status_code for index in range(4)]
+
+        self.assertEqual(codes, [status.HTTP_200_OK] * 4)
+
+    def test_action_without_rate_not_throttled(self):
+        """
+        Ensure an action without a configured rate is only limited by the client rate.
+        """
+        url = reverse('users:user-list')
+        for _ in range(2):
+            self.client.get(url)
+
+        response = self.client.post(url, {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_zero_rate_blocks_action(self):
+        """
+        Ensure a rate of 0 rejects every request of the action without a Retry-After header.
+        """
+        rates = dict(REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **{'user.list': '0/min'})
+        with override_settings(REST_FRAMEWORK=dict(REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=rates)):
+            response = self.client.get(reverse('users:user-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn('Retry-After', response)
+        self.assertIsNotNone(response.data.get('errors'))
+
+    def test_sliding_window_weights_previous_window(self):
+        """
+        Ensure the previous window count decays while the sliding window moves on.
+        """
+        url = reverse('users:user-list')
+        with mock.patch.object(SlidingWindowRateThrottle, 'timer', return_value=600.0):
+            self.client.get(url)
+            self.client.get(url)
+
+        # A quarter into the next window the two previous requests still count as one and a half
+        with mock.patch.object(SlidingWindowRateThrottle, 'timer', return_value=675.0):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '15')
@@ -0,0 +1,76 @@
+import uuid
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import User
+
+
+class UserViewSetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='test', password='test@123')
+        self.url = reverse('users:user-detail', kwargs={'pk': self.user.pk})
+
+    def assertErrorResponse(self, response, status_code):
+        self.assertEqual(response.status_code, status_code)
+        self.assertIsNone(response.data['data'])
+        self.assertIsNotNone(response.data['errors'])
+
+    def test_password_is_hashed_and_hidden(self):
+        """
+        Ensure the password is stored hashed and never returned.
+        """
+        response = self.client.post(reverse('users:user-list'), {'username': 'new', 'password': 'test@123'},
+                                    format='json')
+        self.assertNotIn('password', response.data['data'])
+        self.assertNotEqual(User.objects.get(username='new').password, 'test@123')
+
+        self.assertNotIn('password', self.client.get(self.url, format='json').data['data'])
+
+    def test_invalid_and_unknown_ids(self):
+        """
+        Ensure a malformed or unknown id is answered with not found.
+        """
+        for pk in ('abc', uuid.uuid4()):
+            url = reverse('users:user-detail', kwargs={'pk': pk})
+            self.assertErrorResponse(self.client.get(url, format='json'), status.HTTP_404_NOT_FOUND)
+            self.assertErrorResponse(self.client.patch(url, {}, format='json'), status.HTTP_404_NOT_FOUND)
+            self.assertErrorResponse(self.client.delete(url, format='json'), status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_user_is_not_found(self):
+        """
+        Ensure a deleted user is gone from the detail and list endpoints.
+        """
+        self.assertEqual(self.client.delete(self.url, format='json').status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertErrorResponse(self.client.get(self.url, format='json'), status.HTTP_404_NOT_FOUND)
+        self.assertErrorResponse(self.client.delete(self.url, format='json'), status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('users:user-list'), format='json').data['data']['count'], 0)
+
+    def test_errors_use_the_response_structure(self):
+        """
+        Ensure errors raised by the framework are wrapped in the response structure.
+        """
+        response = self.client.generic('POST', reverse('users:user-list'), '{"username": ', 'application/json')
+        self.assertErrorResponse(response, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {}, format='json')
+        self.assertErrorResponse(response, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_partial_update_keeps_other_fields(self):
+        """
+        Ensure a partial update only changes the given fields.
+        """
+        User.objects.filter(pk=self.user.pk).update(last_name='Last')
+
+        response = self.client.patch(self.url, {'first_name': 'First'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['data']['first_name'], response.data['data']['last_name']), ('First', 'Last'))
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.password, self.user.password)
+        self.assertGreater(user.updated, self.user.updated)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'users.tokens'
+
+
+def issue_token(user):
+    """
+    Signed stateless token of the user
+    Other services holding USER_TOKEN_SECRET_KEY can validate it without a database lookup.
+    :param user:
+    :return:
+    """
+    return signing.dumps({'id': str(user.pk)}, key=settings.USER_TOKEN_SECRET_KEY, salt=TOKEN_SALT, compress=True)
+
+
+def verify_token(token):
+    """
+    User id of a valid token
+    :param token:
+    :return:
+    :raises signing.BadSignature: The token is invalid or expired
+    """
+    data = signing.loads(token, key=settings.USER_TOKEN_SECRET_KEY, salt=TOKEN_SALT,
+                         max_age=settings.USER_TOKEN_MAX_AGE)
+    return data['id']
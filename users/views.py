@@ -1,16 +1,31 @@
 import logging
 
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 
 from service import constants
+from service.idempotency import idempotent
+from service.pagination import LimitOffsetPagination
+from service.throttling import ActionRateThrottle, ClientRateThrottle
 from service.utils import response
-from .models import User
-from .serializers import UserSerializer
+from . import bulk, cache, changelog, imports
+from .activity import tracker
+from .models import User, UserChange, UserImportJob
+from .search import MIN_QUERY_LENGTH, normalize, search
+from .serializers import (LoginSerializer, TokenSerializer, UserBatchSerializer, UserBulkUpdateSerializer,
+                          UserChangeSerializer, UserChangesSerializer, UserImportJobSerializer, UserSearchSerializer,
+                          UserSerializer)
+from .tokens import issue_token, verify_token
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -22,10 +37,13 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = []
     pagination_class = LimitOffsetPagination
+    throttle_classes = [ClientRateThrottle, ActionRateThrottle]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Create a user model instance.
+        Retries with the same Idempotency-Key header get the first response.
         :param request:
         :param args:
         :param kwargs:
@@ -44,6 +62,16 @@ class UserViewSet(viewsets.ModelViewSet):
         logging.error('type=%s msg=%s' % (constants.USER_CREATE_API_ERROR, 'Validation error in user create request'))
         return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def perform_create(self, serializer):
+        """
+        Create a user model instance and log the change in the same transaction.
+        :param serializer:
+        :return:
+        """
+        with transaction.atomic():
+            serializer.save()
+            changelog.record(UserChange.Action.CREATED, [serializer.instance])
+
     def list(self, request, *args, **kwargs):
         """
         List a user queryset.
@@ -78,7 +106,7 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         try:
             return User.objects.get(pk=self.kwargs.get(self.lookup_field))
-        except User.DoesNotExist:
+        except (User.DoesNotExist, ValidationError):
             logging.error('type=%s msg=%s' % (constants.USER_NOT_FOUND, 'User does not exist'))
             raise NotFound(_('User does not exist'))
 
@@ -98,9 +126,11 @@ class UserViewSet(viewsets.ModelViewSet):
         logging.info('type=%s msg=%s' % (constants.USER_RETRIEVE_API_SUCCESS, 'User detail retrieved successfully'))
         return response(data=serializer.data)
 
+    @idempotent
     def update(self, request, *args, **kwargs):
         """
         Update a user model instance.
+        Retries with the same Idempotency-Key header get the first response.
         :param request:
         :param args:
         :param kwargs:
@@ -125,6 +155,17 @@ class UserViewSet(viewsets.ModelViewSet):
         logging.error('type=%s msg=%s' % (constants.USER_UPDATE_API_ERROR, 'Validation error in user update request'))
         return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def perform_update(self, serializer):
+        """
+        Update a user model instance, log the change in the same transaction and drop it from the cache.
+        :param serializer:
+        :return:
+        """
+        with transaction.atomic():
+            serializer.save()
+            changelog.record(UserChange.Action.UPDATED, [serializer.instance])
+        cache.invalidate(serializer.instance.pk)
+
     def partial_update(self, request, *args, **kwargs):
         """
         Partial update a user model instance.
@@ -138,6 +179,22 @@ class UserViewSet(viewsets.ModelViewSet):
         kwargs['partial'] = True
         return self.update(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        """
+        Soft delete or delete a user model instance and log the change in the same transaction.
+        :param instance:
+        :return:
+        """
+        # Deleting the row clears the primary key of the instance
+        user_id = instance.pk
+        with transaction.atomic():
+            changelog.record(UserChange.Action.DELETED, [instance])
+            if settings.USER_SOFT_DELETE:
+                instance.soft_delete()
+            else:
+                instance.delete()
+        cache.invalidate(user_id)
+
     def destroy(self, request, *args, **kwargs):
         """
         Destroy a user model instance.
@@ -153,3 +210,254 @@ class UserViewSet(viewsets.ModelViewSet):
 
         logging.info('type=%s msg=%s' % (constants.USER_DESTROY_API_SUCCESS, 'User deleted successfully'))
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], serializer_class=LoginSerializer)
+    def login(self, request, *args, **kwargs):
+        """
+        Verify the credentials of an active user and issue a signed token.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_LOGIN_API_INIT, 'User login API initiated'))
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_LOGIN_API_ERROR, 'Validation error in user login request'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        password = serializer.validated_data['password']
+        user = User.objects.filter(username=serializer.validated_data['username'], is_active=True).first()
+
+        def rehash(raw_password):
+            # The hasher settings changed, store the password with the current ones without User.save
+            logging.info('type=%s msg=%s' % (constants.USER_LOGIN_API_REHASH, 'User password rehashed'))
+            User.all_objects.filter(pk=user.pk).update(password=make_password(raw_password))
+
+        if user is None:
+            # Hash anyway, so unknown usernames take as long as wrong passwords
+            make_password(password)
+        if user is None or not check_password(password, user.password, setter=rehash):
+            logging.error('type=%s msg=%s' % (constants.USER_LOGIN_API_ERROR, 'Invalid user credentials'))
+            return response(errors={'detail': _('Invalid username or password.')},
+                            status=status.HTTP_401_UNAUTHORIZED)
+
+        tracker.touch(user.pk)
+        data = UserSerializer(user, context=self.get_serializer_context()).data
+        cache.set_users([data])
+
+        logging.info('type=%s msg=%s' % (constants.USER_LOGIN_API_SUCCESS, 'User logged in successfully'))
+        return response(data={'token': issue_token(user), 'expires_in': settings.USER_TOKEN_MAX_AGE, 'user': data})
+
+    @action(detail=False, methods=['post'], serializer_class=TokenSerializer)
+    def verify(self, request, *args, **kwargs):
+        """
+        Verify a token and return its user, served from the cache when possible.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_VERIFY_API_INIT, 'User token verify API initiated'))
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_VERIFY_API_ERROR, 'Validation error in token request'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user_id = verify_token(serializer.validated_data['token'])
+        except signing.BadSignature:
+            logging.error('type=%s msg=%s' % (constants.USER_VERIFY_API_ERROR, 'Invalid or expired token'))
+            return response(errors={'detail': _('Invalid or expired token.')}, status=status.HTTP_401_UNAUTHORIZED)
+
+        data = cache.get_users([user_id]).get(user_id)
+        if data is None:
+            user = User.objects.filter(pk=user_id).first()
+            data = UserSerializer(user, context=self.get_serializer_context()).data if user else None
+            if data is not None:
+                cache.set_users([data])
+
+        if data is None or not data['is_active']:
+            logging.error('type=%s msg=%s' % (constants.USER_VERIFY_API_ERROR, 'Token user is not active'))
+            return response(errors={'detail': _('Invalid or expired token.')}, status=status.HTTP_401_UNAUTHORIZED)
+
+        logging.info('type=%s msg=%s' % (constants.USER_VERIFY_API_SUCCESS, 'User token verified successfully'))
+        return response(data={'user': data})
+
+    @action(detail=False, methods=['get'], url_path='search', url_name='search')
+    def search(self, request, *args, **kwargs):
+        """
+        Search users by a fragment of their first name, last name, email or mobile number.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_SEARCH_API_INIT, 'User search API initiated'))
+
+        serializer = UserSearchSerializer(data=request.query_params)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_SEARCH_API_ERROR, 'Validation error in user search'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        query = serializer.validated_data['q']
+        if len(normalize(query)) < MIN_QUERY_LENGTH:
+            logging.error('type=%s msg=%s' % (constants.USER_SEARCH_API_ERROR, 'User search query is too short'))
+            message = _('Ensure this field has at least %d letters or digits.') % MIN_QUERY_LENGTH
+            return response(errors={'q': [message]}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = min(serializer.validated_data.get('limit', settings.USER_SEARCH_DEFAULT_LIMIT),
+                    settings.USER_SEARCH_MAX_LIMIT)
+        users = search(query, limit)
+        results = [dict(UserSerializer(user, context=self.get_serializer_context()).data, score=user.score)
+                   for user in users]
+
+        logging.info('type=%s msg=%s' % (constants.USER_SEARCH_API_SUCCESS, 'User search completed successfully'))
+        return response(data={'count': len(results), 'results': results})
+
+    @action(detail=False, methods=['get', 'post'], url_path='batch', url_name='batch',
+            serializer_class=UserBatchSerializer)
+    def batch(self, request, *args, **kwargs):
+        """
+        Retrieve many users by id in one request, from the user cache where possible.
+        Pass the ids comma separated in the ids query parameter or as a list in the body of a POST request. The users
+        are returned in the order of the ids and the ids without a user are listed in missing.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_BATCH_API_INIT, 'User batch retrieve API initiated'))
+
+        if request.method == 'GET':
+            data = {'ids': [user_id for value in request.query_params.getlist('ids') for user_id in value.split(',')
+                            if user_id]}
+        else:
+            data = request.data
+        serializer = self.get_serializer(data=data)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_BATCH_API_ERROR, 'Validation error in user batch'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user_ids = list(dict.fromkeys(str(user_id) for user_id in serializer.validated_data['ids']))
+        users = cache.get_users(user_ids)
+        uncached = [user_id for user_id in user_ids if user_id not in users]
+        if uncached:
+            found = UserSerializer(User.objects.filter(pk__in=uncached), many=True,
+                                   context=self.get_serializer_context()).data
+            cache.set_users(found)
+            users.update((str(user['id']), user) for user in found)
+
+        logging.info('type=%s msg=%s' % (constants.USER_BATCH_API_SUCCESS, 'User batch retrieved successfully'))
+        return response(data={
+            'results': [users[user_id] for user_id in user_ids if user_id in users],
+            'missing': [user_id for user_id in user_ids if user_id not in users],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-update', url_name='bulk-update',
+            serializer_class=UserBulkUpdateSerializer)
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Set field values on all the users matching a filter, in batches of single UPDATE queries.
+        With dry_run only the users which would change are counted.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_BULK_UPDATE_API_INIT, 'User bulk update API initiated'))
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_BULK_UPDATE_API_ERROR,
+                                              'Validation error in user bulk update request'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = serializer.validated_data['dry_run']
+        queryset = bulk.filter_users(**serializer.validated_data['filter'])
+        matched, updated = bulk.bulk_update(queryset, serializer.validated_data['values'], dry_run=dry_run)
+
+        logging.info('type=%s msg=%s data=%s' % (constants.USER_BULK_UPDATE_API_SUCCESS, 'User bulk update completed',
+                                                 {'matched': matched, 'updated': updated, 'dry_run': dry_run}))
+        return response(data={'matched': matched, 'updated': updated, 'dry_run': dry_run})
+
+    @action(detail=False, methods=['post'], url_path='imports', url_name='import-list',
+            serializer_class=UserImportJobSerializer, parser_classes=[MultiPartParser, FormParser])
+    def create_import(self, request, *args, **kwargs):
+        """
+        Upload a CSV or NDJSON file of users and import it in the background.
+        The progress and the rejected rows are reported by the import status API.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_IMPORT_API_INIT, 'User import API initiated'))
+
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_IMPORT_API_ERROR,
+                                              'Validation error in user import request'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        job = serializer.save()
+        imports.enqueue(job)
+
+        logging.info('type=%s msg=%s data=%s' % (constants.USER_IMPORT_API_SUCCESS, 'User import queued',
+                                                 {'id': str(job.pk)}))
+        return response(data=serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'imports/(?P<job_id>[0-9a-fA-F-]+)', url_name='import-detail',
+            serializer_class=UserImportJobSerializer)
+    def retrieve_import(self, request, job_id=None, *args, **kwargs):
+        """
+        Retrieve the status, progress and row errors of a user import.
+        :param request:
+        :param job_id:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_IMPORT_STATUS_API_INIT, 'User import status API initiated'))
+
+        imports.fail_stale_imports()
+        try:
+            job = UserImportJob.objects.prefetch_related('errors').get(pk=job_id)
+        except (UserImportJob.DoesNotExist, ValidationError):
+            raise NotFound(_('User import does not exist'))
+
+        logging.info('type=%s msg=%s' % (constants.USER_IMPORT_STATUS_API_SUCCESS, 'User import status retrieved'))
+        return response(data=self.get_serializer(job).data)
+
+    @action(detail=False, methods=['get'], url_path='changes', url_name='changes')
+    def changes(self, request, *args, **kwargs):
+        """
+        List the user changes after a cursor, oldest first.
+        With wait the request is held up to that many seconds until a change arrives. With compact only the latest
+        change of each user in the batch is returned. Pass the returned next cursor as since of the next request.
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        logging.info('type=%s msg=%s' % (constants.USER_CHANGES_API_INIT, 'User changes API initiated'))
+
+        serializer = UserChangesSerializer(data=request.query_params)
+        if not serializer.is_valid(raise_exception=False):
+            logging.error('type=%s msg=%s' % (constants.USER_CHANGES_API_ERROR, 'Validation error in user changes'))
+            return response(errors=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        since = serializer.validated_data['since']
+        limit = min(serializer.validated_data.get('limit', settings.USER_CHANGES_DEFAULT_LIMIT),
+                    settings.USER_CHANGES_MAX_LIMIT)
+        timeout = min(serializer.validated_data['wait'], settings.USER_CHANGES_MAX_WAIT)
+        results, has_more = changelog.wait(since, limit, serializer.validated_data['compact'], timeout)
+
+        logging.info('type=%s msg=%s' % (constants.USER_CHANGES_API_SUCCESS, 'User changes fetched successfully'))
+        return response(data={
+            'results': UserChangeSerializer(results, many=True).data,
+            'next': results[-1].pk if results else since,
+            'has_more': has_more,
+        })